@@ -8,8 +8,24 @@ def main() -> None:
 
     args = parse_args()
     print(f"Debug mode: {args.debug}")
+
+    # the pipeline and its backends are only imported once the arguments are valid
+    if args.timings:
+        import sketchlogic.timings as timings
+        timings.track_imports()
+
     from sketchlogic.controller import run
-    run(args.input_image_path, args.output_json_path, args.debug)
+    run(
+        args.input_image_path, args.output_json_path, args.debug,
+        output_format=args.output_format, compress=args.gzip, targets=args.target,
+        backend=args.backend, enhance_mode=args.enhance, skeleton_method=args.skeleton,
+        wire_extraction=args.wires, orthogonal_wires=args.orthogonal_wires,
+        tile_size=args.tile_size, cascade=args.cascade, max_side=args.max_side, cache_dir=args.cache_dir,
+        debug_dir=args.debug_dir,
+    )
+
+    if args.timings:
+        timings.report()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+"""
+Background writer for the debug artifacts of the pipeline.
+
+In debug mode every stage saves an image of what it did. Drawing the overlays and encoding the
+PNGs takes longer than most stages themselves, so the stages only hand over a snapshot of their
+results and a function that renders it. A single worker thread renders and writes them, keeping
+that work off the critical path. The queue is bounded: when the worker falls behind, new artifacts
+are dropped (and counted) instead of slowing down the pipeline or piling up in memory.
+"""
+
+from pathlib import Path
+from typing import Callable
+from sketchlogic.circuit import ObjectType
+import threading
+import queue
+import json
+import time
+import os
+import cv2
+import numpy
+
+
+class ArtifactWriter:
+    """
+    Writes debug artifacts on a background thread, into one directory per run.
+    """
+
+    def __init__(self, root: Path = Path("debug"), max_pending: int = 16) -> None:
+        """
+        Args:
+            root (Path): The directory the run directories are created in.
+            max_pending (int): How many artifacts can wait to be written before new ones are dropped.
+        """
+
+        self.root = root
+        self.dropped = 0
+        self.failed = 0
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._runs = 0
+
+    def start_run(self) -> "RunArtifacts":
+        """
+        Gets the artifacts of a new run. Its directory is only created once something is written to it.
+        """
+
+        with self._lock:
+            self._runs += 1
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._runs:04d}"
+
+        return RunArtifacts(self, self.root / name)
+
+    def submit(self, path: Path, render: Callable, *args) -> None:
+        """
+        Queues an artifact. render(*args) is called on the worker thread and has to return an image
+        (saved as PNG) or JSON serializable data (saved as JSON), depending on the suffix of the path.
+        """
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name="sketchlogic-artifacts", daemon=True)
+                self._thread.start()
+
+        try:
+            self._queue.put_nowait((path, render, args))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """
+        Waits until every queued artifact is written.
+        """
+
+        if self._thread is not None:
+            self._queue.join()
+
+    def _work(self) -> None:
+        """
+        Renders and writes the queued artifacts, forever.
+        """
+
+        while True:
+            path, render, args = self._queue.get()
+
+            try:
+                _write(path, render(*args))
+            except Exception as e:
+                self.failed += 1
+                print()
+                print(f"sketchlogic.artifacts:")
+                print(f"Failed to write {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+class RunArtifacts:
+    """
+    The debug artifacts of one run of the pipeline, handed to the stages.
+    """
+
+    def __init__(self, writer: ArtifactWriter, directory: Path) -> None:
+        self.writer = writer
+        self.directory = directory
+
+    def save(self, name: str, render: Callable, *args) -> None:
+        """
+        Queues an artifact of this run, see ArtifactWriter.submit().
+
+        Args:
+            name (str): The file name, e.g. "connector_test.png".
+            render (Callable): Renders the artifact from args on the worker thread. Everything it
+                reads has to be a snapshot that the pipeline does not modify afterwards.
+        """
+
+        self.writer.submit(self.directory / name, render, *args)
+
+
+def snapshot(objects: list) -> list[dict]:
+    """
+    Copies what the debug overlays draw of circuit records (their points and boxes) into dictionaries,
+    since the later stages keep modifying the records while the artifact waits to be rendered.
+    """
+
+    output = []
+    for obj in objects:
+        if obj.type is ObjectType.WIRE:
+            output.append({"$id": obj.id, "$type": obj.type.value, "Points": list(obj.points)})
+            continue
+
+        output.append({
+            "$id": obj.id,
+            "$type": obj.type.value,
+            "CenterX": obj.center_x,
+            "CenterY": obj.center_y,
+            "Width": obj.width,
+            "Height": obj.height,
+            "Rotation": obj.rotation,
+        })
+
+    return output
+
+
+def _write(path: Path, artifact: numpy.ndarray | list | dict) -> None:
+    """
+    Writes a rendered artifact.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if path.suffix == ".json":
+        with open(path, "w") as file:
+            json.dump(artifact, file, indent=4)
+    else:
+        cv2.imwrite(str(path), artifact.astype(numpy.uint8))
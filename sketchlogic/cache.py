@@ -0,0 +1,191 @@
+"""
+Content addressed on-disk cache for pipeline results.
+
+Entries are keyed by a hash of the decoded image, the model file and the pipeline configuration,
+so re-submitting the same photo skips enhancement, inference, wiring and conversion. An entry holds
+the laid out circuit rather than one output format, so it serves every target. The cache
+directory can be shared by many processes: entries are written to a temporary file and atomically
+renamed into place, and the least recently used entries are evicted once the directory grows past
+its size limit. Each process keeps a running estimate of that size and only scans the directory
+when the estimate is over the limit or every SCAN_INTERVAL puts, so it can go over the limit by
+what the other processes put in between.
+"""
+
+from pathlib import Path
+from sketchlogic.model.detections import Detections
+from sketchlogic.circuit import Circuit
+import hashlib
+import json
+import threading
+import numpy
+import os
+
+
+# part of every key, bump it whenever a stage changes its output for the same parameters
+VERSION = 3
+
+# how many puts of a process may go by without scanning the directory, see ResultCache.put()
+SCAN_INTERVAL = 100
+
+# the share of max_bytes a cache that is too large is evicted down to, leaving room for puts before the next scan
+EVICT_TO = 0.9
+
+
+class ResultCache:
+    """
+    A size bounded LRU cache of laid out circuits and detections on disk.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 256 * 2**20) -> None:
+        """
+        Args:
+            directory (Path): The directory to keep the entries in. Created if missing.
+            max_bytes (int): The total size of the entries to keep before evicting the least recently used.
+        """
+
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # the size of the entries as of the last scan plus what this process put since, None until the first scan
+        self._estimated_bytes = None
+        self._puts_since_scan = 0
+
+    @staticmethod
+    def key(image: numpy.ndarray, model_hash: str, params: dict) -> str:
+        """
+        Builds the cache key of a decoded image processed with the given model and parameters.
+
+        Args:
+            image (numpy.ndarray): The decoded image, before any processing.
+            model_hash (str): The hash of the model file, see model.controller.Detector.
+            params (dict): Every parameter that changes the output. Must be JSON serializable.
+
+        Returns:
+            str: The hex digest to look the entry up with.
+        """
+
+        digest = hashlib.sha256()
+        header = [VERSION, image.shape, str(image.dtype), model_hash, params]
+        digest.update(json.dumps(header, sort_keys=True).encode())
+        digest.update(numpy.ascontiguousarray(image).data)
+
+        return digest.hexdigest()
+
+    def get(self, key: str) -> tuple[Circuit, Detections] | None:
+        """
+        Looks up an entry and marks it as recently used.
+
+        Returns:
+            tuple[Circuit, Detections] | None: The laid out circuit and the detections, or None on a miss.
+        """
+
+        path = self._path(key)
+
+        try:
+            with open(path, "r") as file:
+                entry = json.load(file)
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            # evicted by another process in the meantime, or unreadable
+            return None
+
+        detections = Detections.from_xywh(
+            numpy.array(entry["detections"]["xywh"], dtype=numpy.float32),
+            entry["detections"]["class_ids"],
+            entry["detections"]["confidences"],
+        )
+        return Circuit.from_dict(entry["circuit"]), detections
+
+    def put(self, key: str, circuit: Circuit, detections: Detections) -> None:
+        """
+        Stores an entry, then evicts the least recently used entries if the cache may be too large.
+        The directory is only scanned when the running estimate of its size goes over max_bytes, or
+        every SCAN_INTERVAL puts to see what other processes sharing it have put.
+        """
+
+        entry = {
+            "circuit": circuit.to_dict(),
+            "detections": {
+                "xywh": detections.xywh().tolist(),
+                "class_ids": detections.class_ids.tolist(),
+                "confidences": detections.confidences.tolist(),
+            },
+        }
+
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temp_path, "w") as file:
+            json.dump(entry, file)
+        size = temp_path.stat().st_size
+
+        try:
+            os.replace(temp_path, path)
+        except PermissionError:
+            # windows does not replace files other processes are reading, the entry is there already
+            temp_path.unlink(missing_ok=True)
+
+        # a replaced entry is counted twice, which only brings the next scan forward
+        if self._estimated_bytes is not None:
+            self._estimated_bytes += size
+        self._puts_since_scan += 1
+
+        if (
+            self._estimated_bytes is None
+            or self._estimated_bytes > self.max_bytes
+            or self._puts_since_scan >= SCAN_INTERVAL
+        ):
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Scans every entry and, if the cache does not fit in max_bytes, deletes the least recently
+        used ones until it fits in EVICT_TO of it.
+        """
+
+        entries = []
+        total = 0
+
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        limit = self.max_bytes * EVICT_TO if total > self.max_bytes else self.max_bytes
+
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= limit:
+                break
+            try:
+                path.unlink(missing_ok=True)
+            except PermissionError:
+                continue
+            total -= size
+
+        self._estimated_bytes = total
+        self._puts_since_scan = 0
+
+    def _path(self, key: str) -> Path:
+        """
+        Gets the file of an entry, sharded by the first two characters of the key.
+        """
+
+        return self.directory / key[:2] / f"{key}.json"
+
+
+def file_hash(path: Path) -> str:
+    """
+    Gets the sha256 hex digest of a file.
+    """
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(2**20), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
@@ -0,0 +1,183 @@
+"""
+The circuit the pipeline builds, as compact records.
+
+The gates, IO, wires and pins are slotted records with integer ids and an enum type, instead of
+a dictionary per object with string ids. This keeps large sheets and batches small in memory, and
+the hot loops read attributes instead of hashing keys and comparing type names. The records only
+become an output format at the very end, see converter.controller.EXPORTERS.
+"""
+
+import enum
+
+
+class ObjectType(enum.Enum):
+    """
+    The type of a circuit object. The values are the type names of the IRIS format.
+    """
+
+    AND_GATE = "AndGate"
+    OR_GATE = "OrGate"
+    NOT_GATE = "NotGate"
+    NAND_GATE = "NandGate"
+    NOR_GATE = "NorGate"
+    XOR_GATE = "XorGate"
+    XNOR_GATE = "XnorGate"
+    TOGGLE = "Toggle"
+    PROBE = "Probe"
+    WIRE = "Wire"
+
+
+GATES = frozenset(object_type for object_type in ObjectType if object_type.value.endswith("Gate"))
+
+
+class Pin:
+    """
+    A pin of a gate or an IO, that wires are attached to by its id.
+    """
+
+    __slots__ = ("id",)
+
+    def __init__(self, id: int) -> None:
+        self.id = id
+
+
+class Gate:
+    """
+    A detected gate. A NotGate has exactly one input pin, the other gates get theirs from the connector.
+    """
+
+    __slots__ = ("id", "type", "center_x", "center_y", "width", "height", "rotation", "inputs", "output")
+
+    def __init__(
+        self, id: int, type: ObjectType, center_x: float, center_y: float, width: float, height: float,
+        rotation: int, inputs: list[Pin], output: Pin
+    ) -> None:
+        self.id = id
+        self.type = type
+        self.center_x = center_x
+        self.center_y = center_y
+        self.width = width
+        self.height = height
+        self.rotation = rotation
+        self.inputs = inputs
+        self.output = output
+
+    def pins(self) -> list[Pin]:
+        """
+        Gets the input pins and the output pin.
+        """
+
+        return self.inputs + [self.output]
+
+
+class IO:
+    """
+    A generated toggle, with an output pin, or probe, with an input pin.
+    """
+
+    __slots__ = ("id", "type", "center_x", "center_y", "width", "height", "rotation", "pin")
+
+    def __init__(
+        self, id: int, type: ObjectType, center_x: float, center_y: float, width: float, height: float,
+        rotation: int, pin: Pin
+    ) -> None:
+        self.id = id
+        self.type = type
+        self.center_x = center_x
+        self.center_y = center_y
+        self.width = width
+        self.height = height
+        self.rotation = rotation
+        self.pin = pin
+
+    def pins(self) -> list[Pin]:
+        """
+        Gets the pin.
+        """
+
+        return [self.pin]
+
+
+class Wire:
+    """
+    A wire from the pin driving it (main_input) to the pin it drives (main_output). The ends are the
+    ids of the pins, None while they are not attached. The net of a fanned out branch is set until
+    the branches are merged, see connector.wiring.generator.merge_nets().
+    """
+
+    __slots__ = ("id", "points", "main_input", "main_output", "net")
+
+    type = ObjectType.WIRE
+
+    def __init__(
+        self, id: int, points: list[tuple[int, int]], main_input: int | None = None, main_output: int | None = None,
+        net: int | None = None
+    ) -> None:
+        self.id = id
+        self.points = points
+        self.main_input = main_input
+        self.main_output = main_output
+        self.net = net
+
+
+class Circuit:
+    """
+    A converted circuit, laid out on the output grid. Every exporter writes its format from one of
+    these, see converter.controller.EXPORTERS.
+    """
+
+    __slots__ = ("model_results", "io_results", "wires")
+
+    def __init__(self, model_results: list[Gate], io_results: list[IO], wires: list[Wire]) -> None:
+        self.model_results = model_results
+        self.io_results = io_results
+        self.wires = wires
+
+    def to_dict(self) -> dict:
+        """
+        Converts the circuit into lists of plain values that can be stored as JSON, see from_dict().
+        """
+
+        return {
+            "gates": [
+                [
+                    gate.id, gate.type.value, gate.center_x, gate.center_y, gate.width, gate.height, gate.rotation,
+                    [pin.id for pin in gate.inputs], gate.output.id,
+                ]
+                for gate in self.model_results
+            ],
+            "io": [
+                [io.id, io.type.value, io.center_x, io.center_y, io.width, io.height, io.rotation, io.pin.id]
+                for io in self.io_results
+            ],
+            "wires": [
+                [wire.id, wire.points, wire.main_input, wire.main_output]
+                for wire in self.wires
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Circuit":
+        """
+        Rebuilds a circuit converted with to_dict().
+        """
+
+        model_results = [
+            Gate(
+                gate_id, ObjectType(type_name), center_x, center_y, width, height, rotation,
+                [Pin(pin_id) for pin_id in input_ids], Pin(output_id)
+            )
+            for gate_id, type_name, center_x, center_y, width, height, rotation, input_ids, output_id in data["gates"]
+        ]
+
+        io_results = [
+            IO(io_id, ObjectType(type_name), center_x, center_y, width, height, rotation, Pin(pin_id))
+            for io_id, type_name, center_x, center_y, width, height, rotation, pin_id in data["io"]
+        ]
+
+        wires = [
+            Wire(wire_id, [tuple(point) for point in points], main_input, main_output)
+            for wire_id, points, main_input, main_output in data["wires"]
+        ]
+
+        return cls(model_results, io_results, wires)
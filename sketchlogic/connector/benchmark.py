@@ -0,0 +1,117 @@
+"""
+Compares the skeletonization methods on the same sketches.
+
+Usage:
+    python -m sketchlogic.connector.benchmark <image_dir> [--enhance median] [--runs 3]
+
+Every image is preprocessed once, then its wire mask is skeletonized with each available method of
+image_handler.SKELETON_METHODS. The report shows the time per method and how close each skeleton is
+to the skimage reference, both in pixels and in the number of contours the connector finds on it.
+"""
+
+from pathlib import Path
+import sketchlogic.processing.image as image_processing
+import sketchlogic.processing.preprocess as preprocess
+import sketchlogic.connector.image_handler as image_handler
+import sketchlogic.connector.contour_handler as contour_handler
+import argparse
+import numpy
+import time
+import cv2
+
+
+IMAGE_SUFFIXES = [".png", ".jpg", ".jpeg", ".bmp"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="benchmark",
+        description="Compare the speed and output of the skeletonization methods.",
+    )
+    parser.add_argument("image_dir", type=Path, help="folder of sketches to benchmark on")
+    parser.add_argument("--enhance", choices=["nlmeans", "median"], default="nlmeans", help="enhance mode")
+    parser.add_argument("--runs", type=int, default=3, help="runs per image and method, the fastest is kept")
+    args = parser.parse_args()
+
+    if not args.image_dir.is_dir():
+        parser.error(f"not a directory: {args.image_dir}")
+
+    paths = sorted(path for path in args.image_dir.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
+    if not paths:
+        parser.error(f"no images found in {args.image_dir}")
+
+    masks = [preprocess.run(image_processing.load(path), args.enhance).wires for path in paths]
+
+    report(benchmark(masks, args.runs), len(masks))
+
+
+def benchmark(masks: list[numpy.ndarray], runs: int = 3) -> dict[str, list[tuple[float, float, int]]]:
+    """
+    Skeletonizes every wire mask with every available method.
+
+    Args:
+        masks (list[numpy.ndarray]): The wire masks, see processing.preprocess.Preprocessed.wires.
+        runs (int): How many times each mask is skeletonized per method, the fastest run is kept.
+
+    Returns:
+        dict[str, list[tuple[float, float, int]]]: Per method, the seconds, the pixel agreement with
+            the skimage skeleton (intersection over union) and the contour count of every mask.
+    """
+
+    methods = [
+        method for method in image_handler.SKELETON_METHODS
+        if method != "opencv" or hasattr(cv2, "ximgproc")
+    ]
+
+    # imported up front, so the first skimage run is not charged for the import
+    import skimage.morphology
+
+    results = {method: [] for method in methods}
+
+    for mask in masks:
+        reference = image_handler.skeletonize(mask, "skimage") > 0
+
+        for method in methods:
+            best = float("inf")
+            for _ in range(max(runs, 1)):
+                start = time.perf_counter()
+                skeleton = image_handler.skeletonize(mask, method)
+                best = min(best, time.perf_counter() - start)
+
+            ink = skeleton > 0
+            union = numpy.count_nonzero(ink | reference)
+            agreement = numpy.count_nonzero(ink & reference) / union if union else 1.0
+
+            contours = contour_handler.detect_all(skeleton, min_length=30, corners_approximation=0.03)
+            results[method].append((best, agreement, len(contours)))
+
+    return results
+
+
+def report(results: dict[str, list[tuple[float, float, int]]], image_count: int) -> None:
+    """
+    Prints the time, pixel agreement and contour counts of every method next to skimage.
+    """
+
+    baseline = results["skimage"]
+    baseline_seconds = sum(row[0] for row in baseline)
+
+    print()
+    print(f"sketchlogic.connector.benchmark:")
+    print(f"{image_count} images, compared to skimage")
+    print(f"{'method':<12}{'time':>12}{'speedup':>10}{'pixels':>10}{'contours':>10}{'same':>10}")
+
+    for method, rows in results.items():
+        seconds = sum(row[0] for row in rows)
+        agreement = sum(row[1] for row in rows) / image_count
+        contours = sum(row[2] for row in rows)
+        same = sum(row[2] == base[2] for row, base in zip(rows, baseline))
+
+        print(
+            f"{method:<12}{seconds / image_count * 1000:>9.1f} ms{baseline_seconds / seconds:>9.1f}x"
+            f"{agreement * 100:>9.2f}%{contours:>10}{same:>6}/{image_count:<3}"
+        )
+
+
+if __name__ == "__main__":
+    main()
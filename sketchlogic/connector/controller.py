@@ -1,66 +1,124 @@
-from pathlib import Path
+from sketchlogic.model.detections import Detections
+from sketchlogic.processing.preprocess import Preprocessed
+from sketchlogic.artifacts import RunArtifacts, snapshot
+from sketchlogic.registry import CircuitRegistry
+import sketchlogic.model.inference as inference
 import sketchlogic.connector.image_handler as image_handler
 import sketchlogic.connector.wiring.generator
 import sketchlogic.connector.wiring.connector
 import sketchlogic.connector.contour_handler as contour_handler
+import sketchlogic.connector.skeleton_graph as skeleton_graph
+import sketchlogic.connector.orthogonal as orthogonal
 import sketchlogic.connector.io_generator as io_generator
 import numpy
+import cv2
 
 
-def run(image: numpy.ndarray, model_results: list, next_id: int, debug: bool = False) -> tuple[list, list, list, int]:
+WIRE_EXTRACTIONS = ("contours", "graph")
+
+
+def run(
+    preprocessed: Preprocessed,
+    detections: Detections,
+    skeleton_method: str = "skimage",
+    wire_extraction: str = "contours",
+    orthogonal_wires: bool = False,
+    debug: bool = False,
+    artifacts: RunArtifacts | None = None,
+    registry: CircuitRegistry | None = None
+) -> tuple[list, list, list, int]:
     """
     Controller for the wiring module. This adds wiring to the model results.
 
-    Dependent on keys:
-        CenterX, CenterY, Width, Height, Rotation
-
     Args:
-        image (numpy.ndarray): The image to add wiring to.
-        model_results (list): The model results to add wiring to.
-        next_id (int): The next id to use for the wiring.
+        preprocessed (Preprocessed): The preprocessed image to add wiring to, see processing.preprocess.run().
+        detections (Detections): The gates detected by the model.
+        skeleton_method (str): The thinning implementation, see image_handler.skeletonize().
+        wire_extraction (str): How wires are read off the skeleton. "contours" traces every contour of
+            it. "graph" traces every skeleton branch once through its junctions, so a wire that fans
+            out to several gates becomes one wire per gate input, see skeleton_graph.
+        orthogonal_wires (bool): Whether to read the wires drawn as horizontal and vertical strokes
+            straight off the wire mask, see orthogonal.detect(). Only the ink it cannot explain is
+            skeletonized and goes through the wire extraction.
+        debug (bool): Whether to print logs.
+        artifacts (RunArtifacts | None): If given, the wires, pins and IOs are drawn on the skeleton
+            and saved as a debug artifact of the run.
+        registry (CircuitRegistry | None): If given, the gates, wires and IOs are registered in it
+            (e.g. to hand it on to converter.controller.run()), otherwise in a registry of its own.
+
+    Raises:
+        ValueError: If the wire extraction is unknown.
 
     Returns:
         tuple[list, list, list, int]: A tuple containing the model results, wires, io results, and the next id.
     """
 
-    image = image_handler.binarize(image, offset=100, non_dark_offset=150, debug=debug)
-    image = image_handler.bridge_gaps(image, max_gap_size=10)
-    image = image_handler.skeletonize(image)
+    if wire_extraction not in WIRE_EXTRACTIONS:
+        raise ValueError(f"connector.controller.run(): unknown wire extraction '{wire_extraction}'.")
 
-    wires_skeleton_image = image_handler.color_boxes(image, model_results, color=0)
+    contours = []
+    wires_image = preprocessed.wires
 
-    contours = contour_handler.detect_all(
-        wires_skeleton_image, min_length=30, 
-        corners_approximation=0.03
-    )
+    if orthogonal_wires:
+        contours, wires_image = orthogonal.detect(
+            preprocessed.wires, image_handler.color_boxes(preprocessed.wires, detections, color=0),
+            min_length=preprocessed.pixels(30), tolerance=preprocessed.pixels(10), debug=debug
+        )
+
+    image = image_handler.skeletonize(wires_image, skeleton_method)
+
+    wires_skeleton_image = image_handler.color_boxes(image, detections, color=0)
+
+    nets = None
+    if wire_extraction == "graph":
+        nodes, edges = skeleton_graph.extract(wires_skeleton_image, min_spur_length=preprocessed.pixels(30))
+        branches, nets = skeleton_graph.polylines(
+            nodes, edges, min_length=preprocessed.pixels(30),
+            corners_approximation=0.03
+        )
+        nets = [None] * len(contours) + nets
+        contours += branches
+    else:
+        contours += contour_handler.detect_all(
+            wires_skeleton_image, min_length=preprocessed.pixels(30),
+            corners_approximation=0.03
+        )
+
+    # the gates only become records here, where pins start getting attached to them
+    model_results, next_id = inference.to_results(detections)
 
     wires, discarded_contours, next_id = sketchlogic.connector.wiring.generator.generate(
         contours, next_id, 
-        optional_min_side=80, 
-        strict_min_side=30, 
-        straightness_tolerance=25,
-        debug=debug
+        optional_min_side=preprocessed.pixels(80),
+        strict_min_side=preprocessed.pixels(30),
+        straightness_tolerance=preprocessed.pixels(25),
+        nets=nets, debug=debug
     )
 
+    if registry is None:
+        registry = CircuitRegistry()
+    for obj in model_results + wires:
+        registry.add(obj)
+
     removed_wires, next_id = sketchlogic.connector.wiring.connector.connect(
         wires, model_results, next_id, 
-        max_range=25, debug=debug
+        max_range=preprocessed.pixels(25), registry=registry, debug=debug
     )
 
+    if nets is not None:
+        removed_wires += sketchlogic.connector.wiring.generator.merge_nets(wires, registry, debug=debug)
+
     io_results, next_id = io_generator.generate(
-        wires, model_results, next_id, debug=debug
+        wires, model_results, next_id, registry, debug=debug
     )
 
-    if debug:
-        image = image_handler.draw_points(image, wires, color=(200, 0, 0))
-        image = image_handler.draw_points(image, discarded_contours, color=(0, 0, 100))
-        image = image_handler.draw_points(image, removed_wires, color=(0, 0, 200))
-
-        image = image_handler.draw_boxes(image, model_results, color=(200, 0, 0))
-        image = image_handler.draw_boxes(image, io_results, color=(200, 0, 0))
-
-        image_handler.save_image(image, Path("connector_test.png"))
+    if artifacts is not None:
+        artifacts.save(
+            "connector_test.png", _render_debug, image,
+            snapshot(wires), discarded_contours, snapshot(removed_wires), snapshot(model_results), snapshot(io_results)
+        )
 
+    if debug:
         print()
         print(f"sketchlogic.connector.controller:")
         print(f"Contours detected: {len(contours)}")
@@ -68,3 +126,22 @@ def run(image: numpy.ndarray, model_results: list, next_id: int, debug: bool = F
         print(f"IOs detected: {len(io_results)}")
 
     return model_results, wires, io_results, next_id
+
+
+def _render_debug(
+    image: numpy.ndarray, wires: list, discarded_contours: list, removed_wires: list, model_results: list, io_results: list
+) -> numpy.ndarray:
+    """
+    Draws the wires, the discarded contours, the removed wires and the boxes on the skeleton.
+    """
+
+    image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+
+    image_handler.draw_points(image, wires, color=(200, 0, 0))
+    image_handler.draw_points(image, discarded_contours, color=(0, 0, 100))
+    image_handler.draw_points(image, removed_wires, color=(0, 0, 200))
+
+    image_handler.draw_boxes(image, model_results, color=(200, 0, 0))
+    image_handler.draw_boxes(image, io_results, color=(200, 0, 0))
+
+    return image
@@ -4,8 +4,9 @@ Helper utils for image processing.
 
 import cv2
 import numpy
-from skimage.morphology import skeletonize as skimage_skeletonize
 from pathlib import Path
+from sketchlogic.model.detections import Detections
+import sketchlogic.connector.thinning as thinning
 
 
 def binarize(image: numpy.ndarray, offset: int, non_dark_offset: int, debug: bool = False) -> numpy.ndarray:
@@ -37,27 +38,64 @@ def binarize(image: numpy.ndarray, offset: int, non_dark_offset: int, debug: boo
     return binary
 
 
-def skeletonize(image: numpy.ndarray) -> numpy.ndarray:
+SKELETON_METHODS = ("skimage", "zhang_suen", "opencv")
+
+
+def skeletonize(image: numpy.ndarray, method: str = "skimage") -> numpy.ndarray:
     """
-    Skeletonizes the image.
+    Skeletonizes the image. Only the bounding box of the ink is thinned, the rest stays black.
 
     Args:
         image (numpy.ndarray): The image to skeletonize.
+        method (str): The thinning implementation, one of SKELETON_METHODS.
+            "skimage" is skimage.morphology.skeletonize(), the reference.
+            "zhang_suen" is the numpy version in thinning.py. It skips importing skimage, which takes
+            longer than the rest of the system together, at the cost of a few pixels of difference.
+            "opencv" is cv2.ximgproc.thinning(), only available with opencv-contrib-python installed.
+
+    Returns:
+        numpy.ndarray: The skeleton, white on black.
+
+    Raises:
+        ValueError: If the method is unknown or not available.
     """
 
-    bool_image = image > 0
-    skeleton = skimage_skeletonize(bool_image)
+    if method not in SKELETON_METHODS:
+        raise ValueError(
+            f"connector.image_handler.skeletonize(): unknown method {method}, expected one of {SKELETON_METHODS}."
+        )
+
+    if method == "opencv" and not hasattr(cv2, "ximgproc"):
+        raise ValueError("connector.image_handler.skeletonize(): the opencv method needs opencv-contrib-python.")
 
-    return (skeleton * 255).astype(numpy.uint8)
+    skeleton = numpy.zeros(image.shape, dtype=numpy.uint8)
 
+    x, y, w, h = cv2.boundingRect(image)
+    if w == 0 or h == 0:
+        return skeleton
 
-def color_boxes(image: numpy.ndarray, boxes: list[dict], color: int) -> numpy.ndarray:
+    ink = image[y:y+h, x:x+w]
+
+    if method == "skimage":
+        # imported here since skimage takes longer to import than the rest of the system together
+        from skimage.morphology import skeletonize as skimage_skeletonize
+        skeleton[y:y+h, x:x+w] = skimage_skeletonize(ink > 0)
+    elif method == "zhang_suen":
+        skeleton[y:y+h, x:x+w] = thinning.zhang_suen(ink)
+    else:
+        skeleton[y:y+h, x:x+w] = cv2.ximgproc.thinning(ink, thinningType=cv2.ximgproc.THINNING_ZHANGSUEN) > 0
+
+    skeleton *= 255
+    return skeleton
+
+
+def color_boxes(image: numpy.ndarray, boxes: list[dict] | Detections, color: int) -> numpy.ndarray:
     """
     Color the boxes in the image.
 
     Args:
         image (numpy.ndarray): The image to color the boxes in.
-        boxes (list): The boxes to color.
+        boxes (list[dict] | Detections): The boxes to color.
         color (int): The color to color the boxes in.
 
     Returns:
@@ -66,14 +104,18 @@ def color_boxes(image: numpy.ndarray, boxes: list[dict], color: int) -> numpy.nd
 
     new_image = image.copy()
 
-    for box in boxes:
-        center_x, center_y, w, h = box["CenterX"], box["CenterY"], box["Width"], box["Height"]
-
-        x = int(center_x - w / 2)
-        y = int(center_y - h / 2)
-        w = int(w)
-        h = int(h)
-
+    if isinstance(boxes, Detections):
+        corners = boxes.corners().tolist()
+    else:
+        corners = [
+            (
+                int(box["CenterX"] - box["Width"] / 2), int(box["CenterY"] - box["Height"] / 2),
+                int(box["Width"]), int(box["Height"])
+            )
+            for box in boxes
+        ]
+
+    for x, y, w, h in corners:
         new_image[y:y+h, x:x+w] = color
 
     return new_image
@@ -1,14 +1,21 @@
-import math
+from sketchlogic.circuit import Gate, IO, Pin, Wire, GATES, ObjectType
+from sketchlogic.registry import CircuitRegistry
+import sketchlogic.geometry as geometry
+import numpy
 
 
-def generate(wires: list, model_results: list, next_id: int, debug: bool) -> tuple[list, int]:
+def generate(
+    wires: list[Wire], model_results: list[Gate], next_id: int, registry: CircuitRegistry, debug: bool
+) -> tuple[list[IO], int]:
     """
     Generates the toggles and probes wherever the wires are disconnected.
 
     Args:
-        wires (list): Wires to generate the toggles and probes for.
-        model_results (list): Model results to compare endpoints with
+        wires (list[Wire]): Wires to generate the toggles and probes for.
+        model_results (list[Gate]): Model results to compare endpoints with
         next_id (int): Next id to use for the toggles and probes.
+        registry (CircuitRegistry): The registry the wires and model results are in. The toggles and
+            probes and their connections are registered.
         debug (bool): Whether to print debug information.
 
     Returns:
@@ -19,45 +26,38 @@ def generate(wires: list, model_results: list, next_id: int, debug: bool) -> tup
     toggles_generated = 0
     probes_generated = 0
 
-    for wire in wires:
-        points = wire["Points"]
-        mainInput = wire["MainInput"]
-        mainOutput = wire["MainOutput"]
-
-        if (mainInput == {} and mainOutput == {}) or (mainInput != {} and mainOutput != {}):
-            continue
+    # the wires that get an IO and the gate they hang from, their ends are measured all at once below
+    pending = []
 
-        if mainInput != {}:
-            ref_comp = _get_co_with_pin_ref(mainInput["$ref"], model_results)
-        elif mainOutput != {}:
-            ref_comp = _get_co_with_pin_ref(mainOutput["$ref"], model_results)
-        else:
+    for wire in wires:
+        if (wire.main_input is None) == (wire.main_output is None):
             continue
 
-        cx, cy = ref_comp["CenterX"], ref_comp["CenterY"]
-        w, h = ref_comp["Width"], ref_comp["Height"]
-        rotation = ref_comp["Rotation"]
-        comp_type = ref_comp["$type"]
+        ref_comp = registry.owner(wire.main_input if wire.main_input is not None else wire.main_output)
 
-        if comp_type == "NotGate":
-            num_inputs = 1
-        elif comp_type.endswith("Gate") and comp_type != "NotGate":
-            num_inputs = len(ref_comp["Inputs"])
-        else:
+        if ref_comp is None or ref_comp.type not in GATES:
             continue
 
-        end1 = points[0]
-        end2 = points[-1]
+        pending.append((wire, ref_comp))
 
-        if _point_to_point_distance(end1, (cx, cy)) > _point_to_point_distance(end2, (cx, cy)):
-            valid_point = end1
-            prev_point = points[1]
-        else:
-            valid_point = end2
-            prev_point = points[-2]
+    if pending:
+        ends, directions = geometry.outer_ends(
+            [wire.points[0] for wire, _ in pending],
+            [wire.points[1] for wire, _ in pending],
+            [wire.points[-1] for wire, _ in pending],
+            [wire.points[-2] for wire, _ in pending],
+            [(ref_comp.center_x, ref_comp.center_y) for _, ref_comp in pending],
+        )
+    else:
+        ends = directions = numpy.empty((0, 2))
+
+    for (wire, ref_comp), end, direction in zip(pending, ends.tolist(), directions.tolist()):
+        w, h = ref_comp.width, ref_comp.height
+        rotation = ref_comp.rotation
+        num_inputs = len(ref_comp.inputs)
 
-        dx = valid_point[0] - prev_point[0]
-        dy = valid_point[1] - prev_point[1]
+        valid_point = end
+        dx, dy = direction
 
         target_w = w / max(3, num_inputs)
         target_h = h / max(3, num_inputs)
@@ -73,38 +73,22 @@ def generate(wires: list, model_results: list, next_id: int, debug: bool) -> tup
             else:
                 valid_point = [valid_point[0], valid_point[1] - (target_h / 2)]
 
-        io = {
-            "$id": str(next_id),
-            "$type": "IO",
-            "CenterX": int(valid_point[0]),
-            "CenterY": int(valid_point[1]),
-            "Width": target_w,
-            "Height": target_h,
-            "Rotation": rotation,
-        }
-        next_id += 1
-
-        if mainInput == {}:
-            io["$type"] = "Toggle"
-            io["State"] = "Low"
-            io["Output"] = {
-                "$id": str(next_id),
-                "Type": "Output"
-            }
-            mainInput["$ref"] = str(next_id)
-            next_id += 1
-            toggles_generated += 1
+        # a toggle drives a wire that has no input yet, a probe is driven by one that has no output
+        io_type = ObjectType.TOGGLE if wire.main_input is None else ObjectType.PROBE
+        io = IO(
+            next_id, io_type, int(valid_point[0]), int(valid_point[1]), target_w, target_h, rotation,
+            Pin(next_id + 1)
+        )
+        next_id += 2
 
-        elif mainOutput == {}:
-            io["$type"] = "Probe"
-            io["Input"] = {
-                "$id": str(next_id),
-                "Type": "Input"
-            }
-            mainOutput["$ref"] = str(next_id)
-            next_id += 1
+        if io_type is ObjectType.TOGGLE:
+            registry.attach(wire, "main_input", io.pin.id)
+            toggles_generated += 1
+        else:
+            registry.attach(wire, "main_output", io.pin.id)
             probes_generated += 1
 
+        registry.add(io)
         output.append(io)
 
     if debug:
@@ -114,44 +98,3 @@ def generate(wires: list, model_results: list, next_id: int, debug: bool) -> tup
         print(f"Probes generated: {probes_generated}")
     
     return output, next_id
-
-
-def _point_to_point_distance(p1: tuple[float, float], p2: tuple[float, float]) -> float:
-    """
-    Calculates the distance from a point to a point.
-    
-    Args:
-        p1 (tuple[float, float]): The first point.
-        p2 (tuple[float, float]): The second point.
-
-    Returns:
-        float: The distance from the first point to the second point.
-    """
-
-    return math.hypot(p1[0] - p2[0], p1[1] - p2[1])
-
-
-def _get_co_with_pin_ref(pin_ref: str, circuit_objects: list) -> dict:
-    """
-    Gets the circuit object with the given pin reference id.
-    """
-
-    for co in circuit_objects:
-        if co["$type"] == "Wire":
-            if co["MainInput"]["$ref"] == pin_ref or co["MainOutput"]["$ref"] == pin_ref:
-                return co
-
-        if co["$type"] in ["NotGate", "Probe"]:
-            if co["Input"]["$id"] == pin_ref:
-                return co
-
-        if co["$type"].endswith("Gate") and co["$type"] != "NotGate":
-            for input in co["Inputs"]:
-                if input["$id"] == pin_ref:
-                    return co
-
-        if co["$type"].endswith("Gate") or co["$type"] == "Toggle":
-            if co["Output"]["$id"] == pin_ref:
-                return co
-
-    return {}
@@ -0,0 +1,203 @@
+"""
+Fast path for wires drawn as straight horizontal and vertical strokes.
+
+The strokes are found with run-length projections: opening the wire mask with a long horizontal
+(vertical) line keeps exactly the pixels that lie on a horizontal (vertical) run at least that long.
+Every connected piece of ink that these runs cover, and whose runs join end to end into a single
+polyline, becomes a wire without being skeletonized or traced. Everything else (slanted strokes,
+junctions, crossings) is left for the skeleton path.
+"""
+
+import cv2
+import numpy
+
+
+HORIZONTAL, VERTICAL = 0, 1
+
+# the share of a piece of ink that the runs have to cover for it to be explained by them
+MIN_COVERAGE = 0.97
+
+
+def detect(
+    wires: numpy.ndarray, image: numpy.ndarray, min_length: int, tolerance: int, debug: bool = False
+) -> tuple[list[numpy.ndarray], numpy.ndarray]:
+    """
+    Detects the orthogonal wires of a binary wire mask.
+
+    Args:
+        wires (numpy.ndarray): The wire mask, white on black.
+        image (numpy.ndarray): The same mask with the gate boxes colored black.
+        min_length (int): The shortest run that counts as a stroke.
+        tolerance (int): How far apart the ends of two strokes can be to still join, and how thick a
+            stroke can wobble before it is no longer straight.
+        debug (bool): Whether to print debug information.
+
+    Returns:
+        tuple[list[numpy.ndarray], numpy.ndarray]: The wires as (N, 1, 2) int32 polylines like
+            contours, and the wire mask without the ink they explain, for the skeleton path.
+    """
+
+    residual = wires.copy()
+
+    # like the skeleton, only the bounding box of the ink is looked at
+    x, y, w, h = cv2.boundingRect(image)
+    if w == 0 or h == 0:
+        return [], residual
+
+    image = image[y:y+h, x:x+w]
+    ink_count, ink_labels = cv2.connectedComponents(image, connectivity=8)
+
+    # an odd length keeps the anchor centered, so the opening never reaches outside the ink
+    length = min_length | 1
+    horizontal = cv2.morphologyEx(image, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (length, 1)))
+    vertical = cv2.morphologyEx(image, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, length)))
+
+    # the edges of a hand drawn stroke are ragged, so the runs are grown by a pixel before comparing
+    runs = cv2.dilate(horizontal | vertical, numpy.ones((3, 3), dtype=numpy.uint8))
+    # the ink is sparse, so everything per pixel is done on its coordinates only
+    xs, ys = cv2.findNonZero(image).reshape(-1, 2).T
+    labels = ink_labels[ys, xs]
+    area = numpy.bincount(labels, minlength=ink_count)
+    uncovered = numpy.bincount(labels[runs[ys, xs] == 0], minlength=ink_count)
+
+    segments = {}
+    for orientation, mask in ((HORIZONTAL, horizontal), (VERTICAL, vertical)):
+        for label, segment in _segments(mask, orientation, ink_labels):
+            segments.setdefault(label, []).append(segment)
+
+    output = []
+    explained = numpy.zeros(ink_count, dtype=bool)
+
+    # pieces without any run are too short or not straight, the skeleton path decides on them
+    for label, piece_segments in segments.items():
+        if uncovered[label] > (1 - MIN_COVERAGE) * area[label]:
+            continue
+
+        polyline = _chain(_merge_collinear(piece_segments, tolerance), tolerance)
+        if polyline is not None:
+            output.append(polyline + numpy.array([x, y], dtype=numpy.int32))
+            explained[label] = True
+
+    erase = explained[labels]
+    residual[ys[erase] + y, xs[erase] + x] = 0
+
+    if debug:
+        print()
+        print(f"sketchlogic.connector.orthogonal:")
+        print(f"Ink pieces: {ink_count - 1}")
+        print(f"Orthogonal wires: {len(output)}")
+        print(f"Left for the skeleton path: {ink_count - 1 - len(output)}")
+
+    return output, residual
+
+
+def _segments(mask: numpy.ndarray, orientation: int, ink_labels: numpy.ndarray) -> list[tuple[int, list]]:
+    """
+    Gets the strokes of one orientation as (ink label, [orientation, start, end, low, high]), where
+    start and end run along the stroke and low and high across it.
+    """
+
+    contours, _ = cv2.findContours(mask, mode=cv2.RETR_EXTERNAL, method=cv2.CHAIN_APPROX_SIMPLE)
+
+    output = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+
+        # every stroke lies inside a single piece of ink, and its contour runs on the stroke
+        label = int(ink_labels[contour[0, 0, 1], contour[0, 0, 0]])
+
+        if orientation == HORIZONTAL:
+            output.append((label, [orientation, x, x + w - 1, y, y + h - 1]))
+        else:
+            output.append((label, [orientation, y, y + h - 1, x, x + w - 1]))
+
+    return output
+
+
+def _merge_collinear(segments: list[list], tolerance: int) -> list[list]:
+    """
+    Merges the strokes of the same orientation that continue each other, like the steps a slightly
+    tilted line is cut into, as long as the merged stroke stays within the tolerance across.
+    """
+
+    merged = []
+    for segment in sorted(segments, key=lambda segment: (segment[0], segment[1])):
+        for other in merged:
+            if (other[0] == segment[0]
+                and segment[1] <= other[2] + tolerance and other[1] <= segment[2] + tolerance
+                and max(other[4], segment[4]) - min(other[3], segment[3]) <= tolerance):
+                other[1], other[2] = min(other[1], segment[1]), max(other[2], segment[2])
+                other[3], other[4] = min(other[3], segment[3]), max(other[4], segment[4])
+                break
+        else:
+            merged.append(list(segment))
+
+    return merged
+
+
+def _end_point(segment: list, end: int) -> tuple[int, int]:
+    """
+    Gets the (x, y) point of the start (end 0) or the end (end 1) of a stroke, on its middle line.
+    """
+
+    orientation, start, stop, low, high = segment
+    along = start if end == 0 else stop
+    across = (low + high) // 2
+
+    return (along, across) if orientation == HORIZONTAL else (across, along)
+
+
+def _chain(segments: list[list], tolerance: int) -> numpy.ndarray | None:
+    """
+    Joins the strokes of a piece of ink into one polyline, turning at right angles where the end of
+    a horizontal stroke meets the end of a vertical one.
+
+    Returns:
+        numpy.ndarray | None: The (N, 1, 2) int32 polyline, or None if the strokes do not form a
+            single open chain (a junction, a crossing, a loop or a jog between parallel strokes).
+    """
+
+    links = {}
+    for i, a in enumerate(segments):
+        for j in range(i + 1, len(segments)):
+            b = segments[j]
+            for end_a in (0, 1):
+                for end_b in (0, 1):
+                    xa, ya = _end_point(a, end_a)
+                    xb, yb = _end_point(b, end_b)
+                    if abs(xa - xb) > tolerance or abs(ya - yb) > tolerance:
+                        continue
+
+                    if a[0] == b[0] or (i, end_a) in links or (j, end_b) in links:
+                        return None
+
+                    links[(i, end_a)] = (j, end_b)
+                    links[(j, end_b)] = (i, end_a)
+
+    if len(links) != 2 * (len(segments) - 1):
+        return None
+
+    free_ends = [(index, end) for index in range(len(segments)) for end in (0, 1) if (index, end) not in links]
+    if len(free_ends) != 2:
+        return None
+
+    index, end = free_ends[0]
+    points = [_end_point(segments[index], end)]
+    visited = {index}
+
+    while (index, 1 - end) in links:
+        next_index, next_end = links[(index, 1 - end)]
+        if next_index in visited:
+            return None
+
+        horizontal, vertical = sorted((segments[index], segments[next_index]), key=lambda segment: segment[0])
+        points.append(((vertical[3] + vertical[4]) // 2, (horizontal[3] + horizontal[4]) // 2))
+
+        index, end = next_index, next_end
+        visited.add(index)
+
+    if len(visited) != len(segments):
+        return None
+
+    points.append(_end_point(segments[index], 1 - end))
+    return numpy.array(points, dtype=numpy.int32).reshape(-1, 1, 2)
@@ -0,0 +1,356 @@
+"""
+Turns a one pixel wide skeleton into a graph of wire polylines.
+
+Endpoints and junctions are found by counting the neighbours of every skeleton pixel at once.
+Removing the junction pixels splits the skeleton into simple chains, which are traced exactly once
+each (findContours traces both sides of a one pixel line). Junctions keep the chains of a net
+together, so a wire that fans out to many gates stays one net instead of one tangled contour.
+"""
+
+import numpy
+import cv2
+
+
+_OFFSETS = [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]
+_NEIGHBOUR_KERNEL = numpy.array([[1, 1, 1], [1, 0, 1], [1, 1, 1]], dtype=numpy.float32)
+
+
+def extract(skeleton: numpy.ndarray, min_spur_length: float) -> tuple[list, list]:
+    """
+    Builds the graph of a skeleton.
+
+    Args:
+        skeleton (numpy.ndarray): The skeleton image, white on black.
+        min_spur_length (float): Dead end branches shorter than this that leave a junction are
+            thinning noise and are removed.
+
+    Returns:
+        tuple[list, list]: The nodes as (x, y) points, and the edges as (node, node, points) where
+            points is an (N, 2) int32 array of x, y running from the first node to the second.
+    """
+
+    ink = (skeleton > 0).view(numpy.uint8)
+    neighbours = cv2.filter2D(ink, cv2.CV_8U, _NEIGHBOUR_KERNEL, borderType=cv2.BORDER_CONSTANT)
+
+    junctions = ink & (neighbours >= 3)
+    _, junction_labels, _, junction_centers = cv2.connectedComponentsWithStats(junctions, connectivity=8)
+
+    nodes = [(int(round(x)), int(round(y))) for x, y in junction_centers[1:]]
+
+    chains = ink & ~junctions
+    chain_count, chain_labels = cv2.connectedComponents(chains, connectivity=8)
+
+    chain_neighbours = cv2.filter2D(chains, cv2.CV_8U, _NEIGHBOUR_KERNEL, borderType=cv2.BORDER_CONSTANT)
+    end_ys, end_xs = numpy.nonzero(chains & (chain_neighbours <= 1))
+    ends = set(zip(end_xs.tolist(), end_ys.tolist()))
+
+    # the pixels of every chain, grouped by label with one sort
+    ys, xs = numpy.nonzero(chains)
+    labels = chain_labels[ys, xs]
+    order = numpy.argsort(labels, kind="stable")
+    bounds = numpy.searchsorted(labels[order], numpy.arange(1, chain_count + 1))
+    pixels = list(zip(xs[order].tolist(), ys[order].tolist()))
+
+    height, width = ink.shape
+    edges = []
+
+    for label in range(1, chain_count):
+        chain = pixels[bounds[label - 1]:bounds[label]]
+        start = next((pixel for pixel in chain if pixel in ends), None)
+        path = _trace(start or chain[0], set(chain))
+
+        first = _junction_at(path[0], junction_labels, width, height)
+        last = _junction_at(path[-1], junction_labels, width, height)
+
+        if start is None and first is None:
+            # a closed loop without junctions, it starts and ends at the same node
+            path.append(path[0])
+            first = last = len(nodes)
+            nodes.append(path[0])
+            edges.append((first, last, numpy.array(path, dtype=numpy.int32)))
+            continue
+
+        if first is None:
+            first = len(nodes)
+            nodes.append(path[0])
+        else:
+            path.insert(0, nodes[first])
+
+        if last is None:
+            last = len(nodes)
+            nodes.append(path[-1])
+        else:
+            path.append(nodes[last])
+
+        edges.append((first, last, numpy.array(path, dtype=numpy.int32)))
+
+    edges = _prune_spurs(nodes, edges, min_spur_length)
+    return nodes, _merge_chains(edges)
+
+
+def polylines(
+    nodes: list, edges: list, min_length: float, corners_approximation: float
+) -> tuple[list[numpy.ndarray], list[int | None]]:
+    """
+    Splits the graph into the polylines the wire generator consumes.
+
+    A net without junctions becomes a single polyline. A net that branches becomes one polyline
+    per dead end, running from the dead end to the busiest junction of the net, so each of them
+    touches at most one gate. They share their net number, see generator.merge_nets().
+
+    Args:
+        nodes (list): The nodes returned by extract().
+        edges (list): The edges returned by extract().
+        min_length (float): Nets whose bounding box has no side at least this long are dropped.
+        corners_approximation (float): The approximation factor for the edges, see cv2.approxPolyDP().
+
+    Returns:
+        tuple[list[numpy.ndarray], list[int | None]]: The polylines as (N, 1, 2) int32 arrays like
+            contours, and the net of each polyline (None if the net does not branch).
+    """
+
+    simplified = [
+        (first, last, cv2.approxPolyDP(
+            points.reshape(-1, 1, 2), closed=False,
+            epsilon=corners_approximation * cv2.arcLength(points.reshape(-1, 1, 2), closed=False)
+        ).reshape(-1, 2))
+        for first, last, points in edges
+    ]
+
+    output = []
+    nets = []
+
+    for net, net_edges in enumerate(_nets(len(nodes), simplified)):
+        points = numpy.concatenate([edge[2] for edge in net_edges])
+        if max(cv2.boundingRect(points)[2:]) < min_length:
+            continue
+
+        degree = {}
+        for first, last, _ in net_edges:
+            degree[first] = degree.get(first, 0) + 1
+            degree[last] = degree.get(last, 0) + 1
+
+        hub = max(degree, key=lambda node: degree[node])
+        leaves = [node for node in degree if degree[node] == 1]
+
+        if len(net_edges) == 1 or degree[hub] < 3 or not leaves:
+            output.extend(edge[2].reshape(-1, 1, 2) for edge in net_edges)
+            nets.extend([None] * len(net_edges))
+            continue
+
+        # every leaf is traced back to the hub, along the same tree, which the branches share near the hub
+        tree = _tree_to(hub, net_edges)
+        for leaf in leaves:
+            output.append(_path_from(leaf, tree).reshape(-1, 1, 2))
+            nets.append(net)
+
+    return output, nets
+
+
+def _trace(start: tuple[int, int], chain: set) -> list[tuple[int, int]]:
+    """
+    Walks a chain of pixels from one of its ends, visiting every pixel once.
+    """
+
+    path = [start]
+    chain.discard(start)
+    x, y = start
+
+    while True:
+        for dx, dy in _OFFSETS:
+            if (x + dx, y + dy) in chain:
+                x, y = x + dx, y + dy
+                chain.discard((x, y))
+                path.append((x, y))
+                break
+        else:
+            return path
+
+
+def _junction_at(pixel: tuple[int, int], junction_labels: numpy.ndarray, width: int, height: int) -> int | None:
+    """
+    Gets the node of the junction next to a chain end, if any.
+    """
+
+    x, y = pixel
+    for dx, dy in _OFFSETS:
+        if 0 <= x + dx < width and 0 <= y + dy < height and junction_labels[y + dy, x + dx]:
+            return int(junction_labels[y + dy, x + dx]) - 1
+
+    return None
+
+
+def _prune_spurs(nodes: list, edges: list, min_length: float) -> list:
+    """
+    Removes the short dead ends that leave a junction, until none are left.
+
+    Every round removes the spurs found with the degrees at its start, like pruning the whole graph
+    over again would. Only the edges at nodes whose degree changed can become spurs in the next
+    round, so those are the only ones checked again, and every edge is measured at most once.
+    """
+
+    degree = [0] * len(nodes)
+    incident = [[] for _ in nodes]
+    for index, (first, last, _) in enumerate(edges):
+        degree[first] += 1
+        degree[last] += 1
+        incident[first].append(index)
+        incident[last].append(index)
+
+    removed = [False] * len(edges)
+    lengths = {}
+    candidates = range(len(edges))
+
+    while True:
+        spurs = []
+        for index in candidates:
+            first, last, points = edges[index]
+            if removed[index] or first == last:
+                continue
+            if min(degree[first], degree[last]) != 1 or max(degree[first], degree[last]) < 3:
+                continue
+
+            if index not in lengths:
+                lengths[index] = cv2.arcLength(points.reshape(-1, 1, 2), closed=False)
+            if lengths[index] < min_length:
+                spurs.append(index)
+
+        if not spurs:
+            return [edge for index, edge in enumerate(edges) if not removed[index]]
+
+        changed = set()
+        for index in spurs:
+            removed[index] = True
+            first, last, _ = edges[index]
+            degree[first] -= 1
+            degree[last] -= 1
+            changed.update((first, last))
+
+        candidates = {index for node in changed for index in incident[node] if not removed[index]}
+
+
+def _merge_chains(edges: list) -> list:
+    """
+    Joins the edges meeting at nodes of degree two (left behind by pruning, or by the corners of a
+    line that look like a junction pixel) into single edges.
+
+    Every edge is followed once: starting from the first edge of a chain that is not joined yet,
+    the chain is walked forwards from its last node and backwards from its first node for as long
+    as the nodes have degree two. A joined edge keeps the direction and the place in the list of the
+    first of its edges.
+    """
+
+    incident = {}
+    for index, (first, last, _) in enumerate(edges):
+        incident.setdefault(first, []).append(index)
+        incident.setdefault(last, []).append(index)
+
+    joined = [False] * len(edges)
+    output = []
+
+    for index, (first, last, points) in enumerate(edges):
+        if joined[index]:
+            continue
+        joined[index] = True
+
+        last, forward = _walk_chain(edges, incident, joined, last, index)
+        first, backward = _walk_chain(edges, incident, joined, first, index)
+
+        if forward or backward:
+            # the backward parts run away from the first node, so they are put back in reverse
+            points = numpy.concatenate([part[::-1] for part in backward[::-1]] + [points] + forward)
+        output.append((first, last, points))
+
+    return output
+
+
+def _walk_chain(edges: list, incident: dict, joined: list, node: int, index: int) -> tuple[int, list]:
+    """
+    Follows a chain away from an edge through the nodes of degree two, marking the edges it takes
+    as joined.
+
+    Returns:
+        tuple[int, list]: The node the chain ends at, and the points of the edges taken, each running
+            away from the edge it started at without repeating the node they share with the previous one.
+    """
+
+    parts = []
+
+    while True:
+        # the other edge at a node of degree two, a loop back into the same node does not count
+        indices = incident[node]
+        if len(indices) != 2 or indices[0] == indices[1]:
+            return node, parts
+
+        index = indices[1] if indices[0] == index else indices[0]
+        if joined[index]:
+            return node, parts
+        joined[index] = True
+
+        first, last, points = edges[index]
+        if first == node:
+            parts.append(points[1:])
+            node = last
+        else:
+            parts.append(points[::-1][1:])
+            node = first
+
+
+def _nets(node_count: int, edges: list) -> list[list]:
+    """
+    Groups the edges into nets, the connected parts of the graph.
+    """
+
+    parent = list(range(node_count))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for first, last, _ in edges:
+        parent[find(first)] = find(last)
+
+    nets = {}
+    for edge in edges:
+        nets.setdefault(find(edge[0]), []).append(edge)
+
+    return list(nets.values())
+
+
+def _tree_to(goal: int, edges: list) -> dict:
+    """
+    Gets, for every node of a net, the next node and the points along the fewest edges towards one
+    node of it, see _path_from().
+    """
+
+    adjacency = {}
+    for first, last, points in edges:
+        adjacency.setdefault(first, []).append((last, points[::-1]))
+        adjacency.setdefault(last, []).append((first, points))
+
+    tree = {goal: None}
+    queue = [goal]
+
+    for node in queue:
+        for neighbour, points in adjacency[node]:
+            if neighbour not in tree:
+                tree[neighbour] = (node, points)
+                queue.append(neighbour)
+
+    return tree
+
+
+def _path_from(start: int, tree: dict) -> numpy.ndarray:
+    """
+    Gets the points along the fewest edges from a node of a net to the node the tree leads to.
+    """
+
+    parts = []
+    node = start
+    while tree[node] is not None:
+        node, points = tree[node]
+        parts.append(points)
+
+    return numpy.concatenate([parts[0]] + [points[1:] for points in parts[1:]])
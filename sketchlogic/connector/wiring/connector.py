@@ -1,71 +1,81 @@
-import math
+from sketchlogic.circuit import Gate, Pin, Wire, GATES, ObjectType
+from sketchlogic.registry import CircuitRegistry
+import sketchlogic.geometry as geometry
+import numpy
 
 
-def connect(wires: list, model_results: list, next_id: int, max_range: int, debug: bool = False) -> tuple[list, int]:
+def connect(
+    wires: list[Wire], model_results: list[Gate], next_id: int, max_range: int, registry: CircuitRegistry,
+    debug: bool = False
+) -> tuple[list[Wire], int]:
     """
     Connects the wires with the model results.
 
     Args:
-        wires (list): The original list of wires to connect.
-        model_results (list): The original list of model results to connect the wires to.
+        wires (list[Wire]): The original list of wires to connect.
+        model_results (list[Gate]): The original list of model results to connect the wires to.
         next_id (int): The next id to use for the wires.
         max_range (int): Max range to look for when doing wire snapping.
+        registry (CircuitRegistry): The registry the wires and model results are in. The added pins
+            and the connections are registered, the removed wires unregistered.
         debug (bool): Whether to print debug information.
 
     Returns:
-        tuple[list, int]: A tuple containing the connected wires and the next id.
+        tuple[list[Wire], int]: A tuple containing the removed wires and the next id.
     """
 
     total_wires = len(wires)
     num_output_connections = 0
     num_input_connections = 0
+    num_pins_not_found = 0
+
+    # wires are neither added nor moved until the sweep below, so the index is built once
+    grid = _build_grid(wires, cell_size=max_range)
 
     for component in model_results:
-        comp_type = component["$type"]
-        cx, cy = component["CenterX"], component["CenterY"]
-        w, h = component["Width"], component["Height"]
-        comp_rotation = component["Rotation"]
+        comp_type = component.type
+        cx, cy = component.center_x, component.center_y
+        w, h = component.width, component.height
+        comp_rotation = component.rotation
 
-        if not comp_type.endswith("Gate"):
+        if comp_type not in GATES:
             continue
 
         for side in ["left", "right"]:      # corresponds to input, output
-            s1, s2 = _get_side(side, int(cx), int(cy), int(w), int(h), component["Rotation"])
+            s1, s2 = geometry.box_side(side, int(cx), int(cy), int(w), int(h), comp_rotation)
 
-            nearby_wires = _get_nearby_wires(wires, s1, s2, max_range)
+            nearby_wires = _get_nearby_wires(grid, wires, s1, s2, max_range)
             min_num_pins = 1 if side == "right" else 2
             num_pins_to_add = max(min_num_pins, len(nearby_wires))
 
-            pin_positions = _divide_segment(s1, s2, num_pins_to_add)
+            pin_positions = geometry.divide(s1, s2, num_pins_to_add)
 
             # THIS IS A PATCH FOR PIN SWAPPING OF 90 DEGREE GATES
             if side == "left" and comp_rotation == 90 and len(pin_positions) > 1:
-                pin_positions = list(reversed(pin_positions))
+                pin_positions = pin_positions[::-1]
 
-            if comp_type != "NotGate" and side == "left":
-                next_id = _add_input_pins(component, num_pins_to_add, next_id)
+            if comp_type is not ObjectType.NOT_GATE and side == "left":
+                next_id = _add_input_pins(component, num_pins_to_add, next_id, registry)
 
             for wire in nearby_wires:
-                pin_idx = _find_closest_pin_index(wire, pin_positions, debug)
-                
-                if side == "right" and wire["MainInput"] == {}:
-                    wire["MainInput"]["$ref"] = component["Output"]["$id"]
+                if side == "right" and wire.main_input is None:
+                    registry.attach(wire, "main_input", component.output.id)
                     num_output_connections += 1
 
-                elif side == "left" and wire["MainOutput"] == {}:
-                    if comp_type == "NotGate":
-                        wire["MainOutput"]["$ref"] = component["Input"]["$id"]
+                elif side == "left" and wire.main_output is None:
+                    if comp_type is ObjectType.NOT_GATE:
+                        registry.attach(wire, "main_output", component.inputs[0].id)
                     else:
-                        wire["MainOutput"]["$ref"] = component["Inputs"][pin_idx]["$id"]
+                        pin_idx = _find_closest_pin_index(wire, pin_positions)
+                        if pin_idx is None:
+                            num_pins_not_found += 1
+                            continue
+
+                        registry.attach(wire, "main_output", component.inputs[pin_idx].id)
                     num_input_connections += 1
 
     # MARK AND SWEEP PHASE BEFORE LEAVING
-    wires_to_remove = []
-    for wire in wires:
-        if wire["MainInput"] == {} and wire["MainOutput"] == {}:
-            wires_to_remove.append(wire)
-    for wire in wires_to_remove:
-        wires.remove(wire)
+    wires_to_remove = registry.sweep(wires)
 
     if debug:
         print()
@@ -74,6 +84,9 @@ def connect(wires: list, model_results: list, next_id: int, max_range: int, debu
         print(f"component output connections formed: {num_output_connections}")
         print(f"component input connections formed: {num_input_connections}")
 
+        if num_pins_not_found > 0:
+            print(f"{num_pins_not_found} wires had no pin to connect to.")
+
         if len(wires_to_remove) > 0:
             print(f"{len(wires_to_remove)} wires had to be removed.")
             print(f"please avoid passing disconnected wires here.")
@@ -81,206 +94,124 @@ def connect(wires: list, model_results: list, next_id: int, max_range: int, debu
     return wires_to_remove, next_id
 
 
-def _add_input_pins(component: dict, num_pins: int, next_id: int) -> int:
+def _add_input_pins(component: Gate, num_pins: int, next_id: int, registry: CircuitRegistry) -> int:
     """
     Adds the given number of input pins to the component.
     
     Args:
-        component (dict): The component to add the pins to.
+        component (Gate): The component to add the pins to.
         num_pins (int): The number of pins to add.
         next_id (int): The next id to use for the pins.
+        registry (CircuitRegistry): The registry to register the pins in.
 
     Returns:
         int: The next id to use for the pins.
     """
 
     for _ in range(num_pins):
-        component["Inputs"].append({
-            "$id": str(next_id),
-            "Type": "Input"
-        })
+        component.inputs.append(Pin(next_id))
+        registry.add_pin(component, next_id)
         next_id += 1
 
     return next_id
 
 
-def _find_closest_pin_index(
-    wire: dict,
-    pin_positions: list[tuple[float, float]],
-    debug: bool,
-    starting_range: float = 40.0,
-    range_multiplier: float = 1.25,
-    patience: int = 3,
-    max_iterations: int = 30,
-) -> int:
+def _find_closest_pin_index(wire: Wire, pin_positions: numpy.ndarray) -> int | None:
     """
-    Finds the closest pin to the given wire. 
-    
+    Finds the pin closest to any point of the given wire.
+
     Args:
-        wire (dict): The wire to check.
-        pin_positions (list[tuple[float, float]]): The positions of the pins to check.
-        debug (bool): Whether to print debug information.
-        starting_range (float): The starting range to look for the closest pin.
-        range_multiplier (float): The multiplier to use for the range.
-        patience (int): The number of times to try to find the closest pin before raising an error.
-        max_iterations (int): The maximum number of iterations to try to find the closest pin.
+        wire (Wire): The wire to check.
+        pin_positions (numpy.ndarray): The (N, 2) positions of the pins to check.
 
     Returns:
-        int: The index of the closest pin.
+        int | None: The index of the closest pin (the first one on a tie), or None if there are no
+            pins or the wire has no points.
     """
 
-    closest_distance = float('inf')
-    closest_pin_index = None
-    iteration = 1
-
-    while closest_pin_index is None:
-        if iteration == max_iterations and debug:
-            print()
-            print("sketchlogic.connector.wiring.connector:")
-            print(f"Failed to find closest pin after {max_iterations} iterations.")
-            exit(1)
-
-        for pin_position in pin_positions:
-            points = wire["Points"]
-            idx = pin_positions.index(pin_position)
-
-            for point in points:
-                dist = _point_to_point_distance(point, pin_position)
-                if dist <= starting_range and dist < closest_distance:
-                    closest_distance = dist
-                    closest_pin_index = idx
-
-        starting_range = starting_range * range_multiplier
-        iteration += 1
+    points = numpy.asarray(wire.points, dtype=numpy.float64).reshape(-1, 2)
+    if len(points) == 0 or len(pin_positions) == 0:
+        return None
 
-    if iteration > patience and debug:
-        print()
-        print("sketchlogic.connector.wiring.connector:")
-        print(f"warning: iteration {iteration} reached.")
-        print(f"consider increasing starting range or range multiplier.")
+    # the distance from every pin (rows) to every point of the wire (columns)
+    pin_distances = numpy.hypot(
+        points[None, :, 0] - pin_positions[:, None, 0], points[None, :, 1] - pin_positions[:, None, 1]
+    )
 
-    return closest_pin_index
+    return int(pin_distances.min(axis=1).argmin())
 
 
-def _get_side(
-    side: str, cx: int, cy: int, w: int, h: int, rotation: int
-) -> tuple[tuple[float, float], tuple[float, float]]:
+def _build_grid(wires: list, cell_size: float) -> dict:
     """
-    Gets the side of a gate represented by two points
+    Builds a uniform grid over the points of the wires, so a side only looks at the points near it.
 
     Args:
-        side (str): Choose from ["left", "right", "top", "bottom"].
-        cx (int): The x coordinate of the center of the gate.
-        cy (int): The y coordinate of the center of the gate.
-        w (int): The width of the gate.
-        h (int): The height of the gate.
-        rotation (int): The rotation of the gate.
+        wires (list): The wires to index.
+        cell_size (float): The side of a grid cell, the max range of the queries works best.
 
     Returns:
-        tuple[tuple[int, int], tuple[int, int]]: A tuple of two points that represent the side of the gate.
+        dict: The cell size under "size", the points and their wire indices sorted by cell under
+            "points" and "owners", and the slice of every cell in them by (column, row) under "cells".
     """
 
-    side_mapping = {"left": 0, "top": 1, "right": 2, "bottom": 3}
-    x = cx - w / 2
-    y = cy - h / 2
-
-    mapping = {
-        0: ((x, y), (x, y + h)),            # left
-        1: ((x, y), (x + w, y)),            # top
-        2: ((x + w, y), (x + w, y + h)),    # right
-        3: ((x, y + h), (x + w, y + h))     # bottom
-    }
+    size = max(float(cell_size), 1.0)
 
-    shift = rotation // 90
-    return mapping[(side_mapping[side.lower()] + shift) % 4]
+    points = numpy.array(
+        [point for wire in wires for point in wire.points], dtype=numpy.float64
+    ).reshape(-1, 2)
+    owners = numpy.repeat(numpy.arange(len(wires)), [len(wire.points) for wire in wires])
 
+    keys = numpy.floor_divide(points, size).astype(numpy.int64)
+    order = numpy.lexsort((keys[:, 1], keys[:, 0]))
+    points, owners, keys = points[order], owners[order], keys[order]
 
-def _divide_segment(p1: tuple[float, float], p2: tuple[float, float], divider: int) -> list[tuple[float, float]]:
-    """
-    Divides a segment into a list of points. This was put in by Claude but it works.
-    
-    Args:
-        p1 (tuple[float, float]): One endpoint of the segment.
-        p2 (tuple[float, float]): The other endpoint of the segment.
-        divider (int): The number of points to divide the segment into.
-
-    Returns:
-        list[tuple[float, float]]: The points that divide the segment.
-    """
+    # the first point of every cell, and the end of the last one
+    starts = numpy.flatnonzero(numpy.r_[True, (keys[1:] != keys[:-1]).any(axis=1)]) if len(keys) else []
+    bounds = numpy.r_[starts, len(keys)].astype(numpy.int64).tolist()
 
-    if divider == 0: return []
-    dx = (p2[0] - p1[0]) / divider
-    dy = (p2[1] - p1[1]) / divider
+    cells = {
+        (int(keys[start, 0]), int(keys[start, 1])): (start, end)
+        for start, end in zip(bounds[:-1], bounds[1:])
+    }
 
-    return [
-        (p1[0] + dx * (i + 0.5), p1[1] + dy * (i + 0.5))
-        for i in range(divider)
-    ]
+    return {"size": size, "points": points, "owners": owners, "cells": cells}
 
 
-def _get_nearby_wires(wires: list, p1: tuple[float, float], p2: tuple[float, float], max_range: int) -> list:
+def _get_nearby_wires(
+    grid: dict, wires: list, p1: tuple[float, float], p2: tuple[float, float], max_range: int
+) -> list:
     """
     Gets the wires that are near the given side represented by two points.
     
     Args:
-        wires (list): The wires to check.
+        grid (dict): The grid over the points of the wires, see _build_grid().
+        wires (list): The wires the grid was built from.
         p1 (tuple[float, float]): One endpoint of the side.
         p2 (tuple[float, float]): The other endpoint of the side.
         max_range (int): The maximum range to look for.
 
     Returns:
-        list: The wires that are near the given side.
-    """
-
-    return [
-        wire for wire in wires if any(
-            _point_to_segment_distance(points, p1, p2) <= max_range for points in wire["Points"]
-        )
-    ]
-    
-
-def _point_to_segment_distance(
-    point: tuple[float, float],
-    p1: tuple[float, float],
-    p2: tuple[float, float]
-) -> float:
-    """
-    Calculates the distance from a point to a line segment.
-
-    Args:
-        point (tuple[float, float]): The point to measure from.
-        p1 (tuple[float, float]): One endpoint of the segment.
-        p2 (tuple[float, float]): The other endpoint of the segment.
-
-    Returns:
-        float: The distance from the point to the segment.
+        list: The wires that are near the given side, in the order of wires.
     """
 
-    x, y = point
-    x1, y1 = p1
-    x2, y2 = p2
-
-    dx = x2 - x1
-    dy = y2 - y1
-    length_sq = dx * dx + dy * dy
-
-    if length_sq == 0:
-        return math.hypot(x - x1, y - y1)
+    size, cells = grid["size"], grid["cells"]
 
-    t = max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / length_sq))
-    return math.hypot(x - (x1 + t * dx), y - (y1 + t * dy))
+    # only the cells overlapping the side grown by max_range can hold a point in range
+    min_col = int((min(p1[0], p2[0]) - max_range) // size)
+    max_col = int((max(p1[0], p2[0]) + max_range) // size)
+    min_row = int((min(p1[1], p2[1]) - max_range) // size)
+    max_row = int((max(p1[1], p2[1]) + max_range) // size)
 
+    slices = [
+        cells[(col, row)]
+        for col in range(min_col, max_col + 1) for row in range(min_row, max_row + 1)
+        if (col, row) in cells
+    ]
+    if not slices:
+        return []
 
-def _point_to_point_distance(p1: tuple[float, float], p2: tuple[float, float]) -> float:
-    """
-    Calculates the distance from a point to a point.
-    
-    Args:
-        p1 (tuple[float, float]): The first point.
-        p2 (tuple[float, float]): The second point.
-
-    Returns:
-        float: The distance from the first point to the second point.
-    """
+    points = numpy.concatenate([grid["points"][start:end] for start, end in slices])
+    owners = numpy.concatenate([grid["owners"][start:end] for start, end in slices])
+    in_range = geometry.segment_distances(points, p1, p2) <= max_range
 
-    return math.hypot(p1[0] - p2[0], p1[1] - p2[1])
+    return [wires[index] for index in sorted(set(owners[in_range].tolist()))]
@@ -1,3 +1,5 @@
+from sketchlogic.circuit import Wire
+from sketchlogic.registry import CircuitRegistry
 import cv2
 from cv2.typing import MatLike
 import numpy
@@ -9,6 +11,7 @@ def generate(
     optional_min_side: int, 
     strict_min_side: int,
     straightness_tolerance: float,
+    nets: list[int | None] | None = None,
     debug: bool = False
 ) -> tuple[list, list, int]:
     """
@@ -19,6 +22,9 @@ def generate(
         optional_min_side (int): Allows for contours that are larger than this.
         strict_min_side (int): The strict minimum length of the wire.
         straightness_tolerance (float): The straightness tolerance of the wire.
+        nets (list[int | None] | None): The net of each contour, see skeleton_graph.polylines().
+            Contours that are branches of a net skip the size filters (their net as a whole passed
+            them already) and are joined back together by merge_nets() once they are connected.
         debug (bool): Whether to print debug information.
 
     Returns:
@@ -29,8 +35,10 @@ def generate(
     output = []
     discarded_contours = []
 
-    for contour in contours:
-        if not _has_minimum_side(contour, optional_min_side):
+    for index, contour in enumerate(contours):
+        net = nets[index] if nets is not None else None
+
+        if net is None and not _has_minimum_side(contour, optional_min_side):
             if (not _has_minimum_side(contour, strict_min_side) or 
                 not _straightness_test(contour, straightness_tolerance)):
                 discarded_contours.append(
@@ -41,15 +49,13 @@ def generate(
         wire_points = [(int(pt[0][0]), int(pt[0][1])) for pt in contour]
 
         if _straightness_test(contour, straightness_tolerance) and len(wire_points) > 2:
-            wire_points = remove_collinear_points(wire_points)
-
-        output.append({
-            "$id": str(next_id),
-            "$type": "Wire",
-            "Points": wire_points,
-            "MainInput": {},
-            "MainOutput": {}
-        })
+            # a branch of a net has to keep running from its gate to the junction, see merge_nets()
+            if net is None:
+                wire_points = remove_collinear_points(wire_points)
+            else:
+                wire_points = [wire_points[0], wire_points[-1]]
+
+        output.append(Wire(next_id, wire_points, net=net))
         next_id += 1
 
     if debug:
@@ -61,6 +67,70 @@ def generate(
     return output, discarded_contours, next_id
 
 
+def merge_nets(wires: list[Wire], registry: CircuitRegistry, debug: bool = False) -> list[Wire]:
+    """
+    Joins the branches of every net that fans out. Each branch connected to a gate input becomes a
+    wire from the branch connected to a gate output, following the skeleton through the junctions.
+    The nets are cleared on all the wires.
+
+    Args:
+        wires (list[Wire]): The connected wires, see connector.connect(). Modified in place.
+        registry (CircuitRegistry): The registry the wires are in, kept up to date.
+        debug (bool): Whether to print debug information.
+
+    Returns:
+        list[Wire]: The source branches that were merged into the other branches and removed.
+    """
+
+    branches = {}
+    for wire in wires:
+        if wire.net is not None:
+            branches.setdefault(wire.net, []).append(wire)
+            wire.net = None
+
+    removed = []
+    fanned_out = 0
+
+    for net_wires in branches.values():
+        sources = [wire for wire in net_wires if wire.main_input is not None]
+        sinks = [wire for wire in net_wires if wire.main_input is None and wire.main_output is not None]
+
+        if not sources or not sinks:
+            continue
+
+        source = sources[0]
+        for sink in sinks:
+            registry.attach(sink, "main_input", source.main_input)
+            sink.points = _join_branches(source.points, sink.points)
+            fanned_out += 1
+
+        if source.main_output is None:
+            removed.append(source)
+
+    registry.discard(wires, removed)
+
+    if debug:
+        print()
+        print(f"sketchlogic.connector.wiring.generator:")
+        print(f"Nets merged: {sum(1 for net_wires in branches.values() if len(net_wires) > 1)}")
+        print(f"Wires fanned out: {fanned_out}")
+
+    return removed
+
+
+def _join_branches(source: list[tuple[int, int]], sink: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """
+    Joins two branches that both run from their gate to the same junction, leaving out the part
+    of the path they share.
+    """
+
+    shared = 0
+    while shared < min(len(source), len(sink)) and source[-1 - shared] == sink[-1 - shared]:
+        shared += 1
+
+    return source[:len(source) - shared + 1] + sink[:len(sink) - shared][::-1]
+
+
 def _has_minimum_side(contour: MatLike, min_side: int) -> bool:
     """
     Checks if the contour has a minimum length or width.
@@ -1,31 +1,54 @@
 from pathlib import Path
-import sketchlogic.model.controller
-import sketchlogic.connector.controller
-import sketchlogic.converter.controller
-import sketchlogic.processing.image as image_processing
-import json
+from sketchlogic.pipeline import Pipeline
+import sketchlogic.converter.controller as converter
 
 
-def run(input_image_path: Path, output_json_path: Path, debug: bool = False) -> None:
+_pipelines: dict[tuple, Pipeline] = {}
+
+
+def run(
+    input_image_path: Path, output_json_path: Path, debug: bool = False, output_format: str = "compact",
+    compress: bool = False, targets: list[str] | tuple[str, ...] = ("iris",), **config
+) -> None:
     """
-    Controller for the sketchlogic system.
+    Controller for the sketchlogic system. Repeated calls share one warmed up Pipeline per configuration.
+
+    Args:
+        input_image_path (Path): The sketch to convert.
+        output_json_path (Path): The file to write the circuit to. With several targets, every target
+            is written next to it with the extension of the target instead, e.g. circuit.iris and circuit.circ.
+        debug (bool): Whether to output test files and print logs.
+        output_format (str): "compact" or "pretty", see converter.controller.write().
+        compress (bool): Whether to gzip the output files.
+        targets (list[str] | tuple[str, ...]): The formats to write, see converter.controller.EXPORTERS. All of them are
+            written from a single run of the pipeline.
+        config: Keyword arguments for the Pipeline, e.g. backend, tile_size, max_side or cache_dir.
     """
 
-    image = image_processing.load(input_image_path)
-    image = image_processing.enhance(image)
+    # an unsupported target fails before the image is processed
+    exporters = [converter.get_exporter(target) for target in targets]
 
-    if debug: 
-        image_processing.save(image, Path("enhancer_test.png"))
+    # passed on encoded, so the pipeline can decode straight to its working resolution
+    pipeline = get_pipeline(**config)
+    circuit = pipeline.run(input_image_path.read_bytes(), debug=debug, target=None)
 
-    model_results, next_id = sketchlogic.model.controller.run(image, debug=debug)
+    for target, exporter in zip(targets, exporters):
+        path = output_json_path if len(targets) == 1 else output_json_path.with_suffix(exporter.EXTENSION)
+        converter.write(circuit, target, path, format=output_format, compress=compress)
 
-    model_results, wires, io_results, next_id = sketchlogic.connector.controller.run(
-        image, model_results, next_id, debug=debug
-    )
+    # the debug artifacts are written in the background, they have to be done before exiting
+    pipeline.flush()
 
-    output = sketchlogic.converter.controller.run(model_results, wires, io_results, debug=debug)
+    print()
 
-    with open(output_json_path, "w") as file:
-        json.dump(output, file, indent=4)
 
-    print()
+def get_pipeline(**config) -> Pipeline:
+    """
+    Returns the shared Pipeline of the given configuration, creating it on first use.
+    """
+
+    key = tuple(sorted(config.items()))
+    if key not in _pipelines:
+        _pipelines[key] = Pipeline(**config)
+
+    return _pipelines[key]
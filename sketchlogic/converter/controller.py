@@ -1,50 +1,114 @@
-import sketchlogic.converter.iris.gates as gate_converter
-import sketchlogic.converter.iris.wires as wiring
-import sketchlogic.converter.iris.io as io_converter
-import sketchlogic.converter.iris.straightener as straightener
-import sketchlogic.connector.image_handler as image_handler
-import sketchlogic.converter.iris.scale_factor as scale_factor_calculator
-import sketchlogic.converter.iris.translate_factor as translate_factor_calculator
 from pathlib import Path
+from typing import BinaryIO
+import sketchlogic.converter.straightener as straightener
+import sketchlogic.converter.transform as transform
+import sketchlogic.connector.image_handler as image_handler
+import sketchlogic.output as output_writer
+from sketchlogic.artifacts import RunArtifacts, snapshot
+from sketchlogic.circuit import Circuit
+from sketchlogic.registry import CircuitRegistry
+import importlib
+import numpy
 
 
-def run(model_results: list, wires: list, io_results: list, debug: bool = False) -> list:
-    """
-    Controller for the converter module.
+# the serializer module of every target, each with an EXTENSION, serialize(circuit) and write(circuit, stream, format)
+EXPORTERS = {
+    "iris": "sketchlogic.converter.iris.serializer",
+    "logisim": "sketchlogic.converter.logisim.serializer",
+}
 
-    NOTE: since translation is calculated based on the scale factor, it MUST be applied only after the
-    scale factor is applied. This has to be fixed soon.
+
+def run(
+    model_results: list, wires: list, io_results: list, debug: bool = False, artifacts: RunArtifacts | None = None,
+    registry: CircuitRegistry | None = None
+) -> Circuit:
+    """
+    Controller for the converter module. If artifacts are given, the scaled circuit is drawn and
+    saved as a debug artifact of the run. The connections are looked up in the registry the
+    connector filled, see connector.controller.run(), or in one built from the circuit records. The
+    laid out circuit is the same for every target, see export() and write().
     """
 
-    scale_factor = scale_factor_calculator.calculate(
-        model_results, io_results, per_component=60, per_io=20
+    transform.apply(
+        model_results, io_results, wires, per_component=60, per_io=20, center_x=1000, center_y=1000
     )
 
-    translate_x, translate_y = translate_factor_calculator.calculate(
-        model_results, scale_factor, center_x=1000, center_y=1000
-    )
+    if artifacts is not None:
+        artifacts.save(
+            "converter_test.png", _render_debug, snapshot(wires), snapshot(model_results), snapshot(io_results)
+        )
+
+    if registry is None:
+        registry = CircuitRegistry(model_results + io_results + wires)
+
+    straightener.straighten(model_results, registry, min_wire_length=30, debug=debug)
+
+    return Circuit(model_results, io_results, wires)
+
+
+def get_exporter(target: str):
+    """
+    Gets the serializer module of a target.
+
+    Args:
+        target (str): One of EXPORTERS.
+
+    Raises:
+        ValueError: If the target is not supported.
+    """
+
+    if target not in EXPORTERS:
+        raise ValueError(
+            f"converter.controller.get_exporter(): unsupported target {target}, choose from {list(EXPORTERS)}."
+        )
+
+    return importlib.import_module(EXPORTERS[target])
+
+
+def export(circuit: Circuit, target: str) -> list | str:
+    """
+    Converts a laid out circuit into the output of a target, e.g. the circuit objects of the IRIS format.
+    """
+
+    return get_exporter(target).serialize(circuit)
+
+
+def write(
+    circuit: Circuit, target: str, destination: Path | BinaryIO, format: str = "compact", compress: bool = False
+) -> None:
+    """
+    Writes a laid out circuit in the format of a target, streaming it to the destination.
+
+    Args:
+        circuit (Circuit): The laid out circuit, see run().
+        target (str): One of EXPORTERS.
+        destination (Path | BinaryIO): The file to write to, or an open binary stream such as
+            socket.makefile("wb"), see output.open_destination().
+        format (str): "compact" or "pretty".
+        compress (bool): Whether to gzip the output.
+
+    Raises:
+        ValueError: If the target or the format is not supported.
+    """
+
+    exporter = get_exporter(target)
+    if format not in output_writer.FORMATS:
+        raise ValueError(
+            f"converter.controller.write(): unknown format {format!r}, expected one of {output_writer.FORMATS}."
+        )
+
+    with output_writer.open_destination(destination, compress) as stream:
+        exporter.write(circuit, stream, format)
+
+
+def _render_debug(wires: list, model_results: list, io_results: list) -> numpy.ndarray:
+    """
+    Draws the scaled and translated circuit on a blank canvas.
+    """
+
+    image = image_handler.create_blank(width=2000, height=2000)
+    image_handler.draw_points(image, wires, color=(255, 0, 0))
+    image_handler.draw_boxes(image, model_results, color=(255, 0, 0))
+    image_handler.draw_boxes(image, io_results, color=(255, 0, 0))
 
-    gate_converter.resize(model_results, scale_factor, translate_x, translate_y)
-    io_converter.resize(io_results, scale_factor, translate_x, translate_y)
-    wiring.resize(wires, scale_factor, translate_x, translate_y)
-
-    if debug:
-        image = image_handler.create_blank(width=2000, height=2000)
-        image = image_handler.draw_points(image, wires, color=(255, 0, 0))
-        image = image_handler.draw_boxes(image, model_results, color=(255, 0, 0))
-        image = image_handler.draw_boxes(image, io_results, color=(255, 0, 0))
-        image_handler.save_image(image, Path("converter_test.png"))
-
-    try:
-        straightener.straighten(model_results, io_results, wires, min_wire_length=30, debug=debug)
-    except Exception as e:
-        if debug:
-            print()
-            print(f"sketchlogic.converter.controller:")
-            print(f"Error straightening: {e}")
-
-    gate_converter.convert(model_results)
-    io_converter.convert(io_results)
-    wiring.clear(wires)
-
-    return model_results + io_results + wires
+    return image
@@ -0,0 +1,114 @@
+from sketchlogic.circuit import Circuit, Gate, IO, Pin, Wire, ObjectType
+from typing import BinaryIO
+import sketchlogic.output as output_writer
+
+
+EXTENSION = ".iris"
+
+
+def serialize(circuit: Circuit) -> list[dict]:
+    """
+    Converts the circuit records into the circuit objects of the IRIS format, in the same order.
+
+    Args:
+        circuit (Circuit): The laid out circuit. IRis routes the wires itself, so their points are left out.
+
+    Returns:
+        list[dict]: The gates, the toggles and probes, and the wires.
+    """
+
+    return (
+        [_serialize_gate(gate) for gate in circuit.model_results]
+        + [_serialize_io(io) for io in circuit.io_results]
+        + [_serialize_wire(wire) for wire in circuit.wires]
+    )
+
+
+def write(circuit: Circuit, stream: BinaryIO, format: str = "compact") -> None:
+    """
+    Writes the circuit as an .iris file onto an open binary stream, see output.dump().
+
+    Args:
+        circuit (Circuit): The laid out circuit.
+        stream (BinaryIO): The stream to write to.
+        format (str): "compact" or "pretty".
+    """
+
+    output_writer.dump(serialize(circuit), stream, format)
+
+
+def _serialize_gate(gate: Gate) -> dict:
+    """
+    Converts a gate. A NotGate has a single "Input", the other gates a list of "Inputs".
+    """
+
+    output = {
+        "$id": str(gate.id),
+        "$type": gate.type.value,
+        "Rotation": float(gate.rotation),
+    }
+
+    if gate.type is ObjectType.NOT_GATE:
+        output["Input"] = _serialize_pin(gate.inputs[0], "Input")
+    else:
+        output["Inputs"] = [_serialize_pin(pin, "Input") for pin in gate.inputs]
+
+    output["Output"] = _serialize_pin(gate.output, "Output")
+    output["X"], output["Y"] = _top_left(gate)
+
+    return output
+
+
+def _serialize_io(io: IO) -> dict:
+    """
+    Converts a toggle, which starts low, or a probe.
+    """
+
+    output = {
+        "$id": str(io.id),
+        "$type": io.type.value,
+        "Rotation": float(io.rotation),
+    }
+
+    if io.type is ObjectType.TOGGLE:
+        output["State"] = "Low"
+        output["Output"] = _serialize_pin(io.pin, "Output")
+    else:
+        output["Input"] = _serialize_pin(io.pin, "Input")
+
+    output["X"], output["Y"] = _top_left(io)
+
+    return output
+
+
+def _serialize_wire(wire: Wire) -> dict:
+    """
+    Converts a wire, referencing the pins at its ends.
+    """
+
+    return {
+        "$id": str(wire.id),
+        "$type": wire.type.value,
+        "Points": [],
+        "MainInput": {} if wire.main_input is None else {"$ref": str(wire.main_input)},
+        "MainOutput": {} if wire.main_output is None else {"$ref": str(wire.main_output)},
+    }
+
+
+def _serialize_pin(pin: Pin, pin_type: str) -> dict:
+    """
+    Converts a pin, "Input" or "Output".
+    """
+
+    return {"$id": str(pin.id), "Type": pin_type}
+
+
+def _top_left(component: Gate | IO) -> tuple[float, float]:
+    """
+    Gets the top left corner of a component, rounded to whole units.
+    """
+
+    return (
+        float(round(component.center_x - component.width / 2)),
+        float(round(component.center_y - component.height / 2)),
+    )
@@ -0,0 +1,423 @@
+"""
+Writes a laid out circuit as a Logisim Evolution project (.circ).
+
+Logisim connects wires by where their ends are, not by references to pins. Every gate is placed
+with its output in the middle of the output side of its box, and its inputs are where Logisim puts
+them for the size and number of inputs of the gate. The toggles and probes become input and output
+pins at their centers, and the whole circuit is moved onto the canvas if any of it is left of or
+above it. Every wire attached at both ends is then routed between the locations of its two pins
+with horizontal and vertical segments: across, along a column, then across. Wires attached at one
+end only connect nothing and are left out.
+
+Logisim also joins two wires where they run along each other, or where the end of one is on the
+other, so the column is the free grid column nearest the middle: one where no segment of the wire
+would touch another net, or a pin that is not on its net. A wire with no free column, or a straight
+one that is not free, leaves its pin to a column near it, crosses on a free row and comes in on a
+column near the other pin instead. Wires of different nets then only cross.
+
+The XML is written element by element onto the stream, without building the document first.
+"""
+
+from sketchlogic.circuit import Circuit, Gate, IO, ObjectType
+from collections import defaultdict
+from typing import BinaryIO, Iterable, Iterator
+import sketchlogic.output as output_writer
+import io
+
+
+EXTENSION = ".circ"
+
+# the Logisim Evolution version the projects are written for
+SOURCE_VERSION = "3.8.0"
+
+WIRING_LIB = "0"
+GATES_LIB = "1"
+
+GRID_SIZE = 10
+MARGIN = 100
+GATE_SIZE = 50
+NOT_GATE_SIZE = 30
+
+# how many grid lines either side a wire may turn in, see _route()
+COLUMN_SEARCH = 100
+DETOUR_SEARCH = 10
+
+_GATE_NAMES = {
+    ObjectType.AND_GATE: "AND Gate",
+    ObjectType.OR_GATE: "OR Gate",
+    ObjectType.NOT_GATE: "NOT Gate",
+    ObjectType.NAND_GATE: "NAND Gate",
+    ObjectType.NOR_GATE: "NOR Gate",
+    ObjectType.XOR_GATE: "XOR Gate",
+    ObjectType.XNOR_GATE: "XNOR Gate",
+}
+
+# how far behind the output the inputs are, xor gates have a second curve and negated gates a bubble
+_INPUT_DEPTHS = {
+    ObjectType.AND_GATE: GATE_SIZE,
+    ObjectType.OR_GATE: GATE_SIZE,
+    ObjectType.NOT_GATE: NOT_GATE_SIZE,
+    ObjectType.NAND_GATE: GATE_SIZE + 10,
+    ObjectType.NOR_GATE: GATE_SIZE + 10,
+    ObjectType.XOR_GATE: GATE_SIZE + 10,
+    ObjectType.XNOR_GATE: GATE_SIZE + 20,
+}
+
+# an unrotated gate has its inputs on the left and its output on the right, see geometry.box_side()
+_FACINGS = ("east", "south", "west", "north")
+_DIRECTIONS = {"east": (1, 0), "south": (0, 1), "west": (-1, 0), "north": (0, -1)}
+
+
+def serialize(circuit: Circuit) -> str:
+    """
+    Converts the circuit into the XML of a Logisim Evolution project, see write().
+
+    Args:
+        circuit (Circuit): The laid out circuit.
+
+    Returns:
+        str: The project.
+    """
+
+    stream = io.BytesIO()
+    write(circuit, stream)
+
+    return stream.getvalue().decode("utf-8")
+
+
+def write(circuit: Circuit, stream: BinaryIO, format: str = "compact") -> None:
+    """
+    Writes the circuit as a Logisim Evolution project onto an open binary stream.
+
+    Args:
+        circuit (Circuit): The laid out circuit.
+        stream (BinaryIO): The stream to write to.
+        format (str): "compact", or "pretty" to put every element on an indented line of its own.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+
+    if format not in output_writer.FORMATS:
+        raise ValueError(
+            f"logisim.serializer.write(): unknown format {format!r}, expected one of {output_writer.FORMATS}."
+        )
+
+    text = io.TextIOWrapper(stream, encoding="utf-8")
+    pretty = format == "pretty"
+
+    def element(depth: int, xml: str) -> None:
+        text.write(f"{'  ' * depth}{xml}\n" if pretty else xml)
+
+    text.write('<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n')
+    element(0, f'<project source="{SOURCE_VERSION}" version="1.0">')
+    element(1, f'<lib desc="#Wiring" name="{WIRING_LIB}"/>')
+    element(1, f'<lib desc="#Gates" name="{GATES_LIB}"/>')
+    element(1, '<main name="main"/>')
+    element(1, '<circuit name="main">')
+    element(2, '<a name="circuit" val="main"/>')
+
+    # where the wires have to end to connect to every pin
+    locations = {}
+    gates = [(gate, *_place_gate(gate, locations)) for gate in circuit.model_results]
+    io_results = [(io_result, *_place_io(io_result, locations)) for io_result in circuit.io_results]
+
+    shift_x, shift_y = _get_shift(locations.values())
+    if shift_x or shift_y:
+        locations = {pin_id: (x + shift_x, y + shift_y) for pin_id, (x, y) in locations.items()}
+
+    for gate, facing, x, y in gates:
+        x, y = x + shift_x, y + shift_y
+
+        element(2, f'<comp lib="{GATES_LIB}" loc="({x},{y})" name="{_GATE_NAMES[gate.type]}">')
+        element(3, f'<a name="facing" val="{facing}"/>')
+        if gate.type is ObjectType.NOT_GATE:
+            element(3, f'<a name="size" val="{NOT_GATE_SIZE}"/>')
+        else:
+            element(3, f'<a name="size" val="{GATE_SIZE}"/>')
+            element(3, f'<a name="inputs" val="{len(gate.inputs)}"/>')
+        element(2, '</comp>')
+
+    for io_result, facing, x, y in io_results:
+        x, y = x + shift_x, y + shift_y
+
+        element(2, f'<comp lib="{WIRING_LIB}" loc="({x},{y})" name="Pin">')
+        element(3, f'<a name="facing" val="{facing}"/>')
+        if io_result.type is ObjectType.PROBE:
+            element(3, '<a name="output" val="true"/>')
+        element(2, '</comp>')
+
+    # the wires attached at both ends, a fanned out net has a wire per branch from the same main input
+    wires = [
+        wire for wire in circuit.wires if wire.main_input in locations and wire.main_output in locations
+    ]
+
+    # every pin is on the net of the wires attached to it, or on a net of its own
+    nets = {pin_id: pin_id for pin_id in locations}
+    for wire in wires:
+        nets[wire.main_output] = wire.main_input
+
+    wiring = _Wiring()
+    for pin_id, location in locations.items():
+        wiring.add_point(location, nets[pin_id])
+
+    # the branches of a net may be routed along the same segments, which are written once
+    written = set()
+
+    for wire in wires:
+        start, end = locations[wire.main_input], locations[wire.main_output]
+        for segment in _route(start, end, wire.main_input, wiring):
+            if segment in written:
+                continue
+            written.add(segment)
+
+            (x1, y1), (x2, y2) = segment
+            element(2, f'<wire from="({x1},{y1})" to="({x2},{y2})"/>')
+
+    element(1, '</circuit>')
+    element(0, '</project>')
+
+    text.flush()
+
+    # leaves the stream open for the caller
+    text.detach()
+
+
+def _place_gate(gate: Gate, locations: dict[int, tuple[int, int]]) -> tuple[str, int, int]:
+    """
+    Gets the facing and the location of the output of a gate, and adds the locations of its pins.
+    """
+
+    facing = _FACINGS[gate.rotation // 90 % 4]
+    dx, dy = _DIRECTIONS[facing]
+
+    x = round(gate.center_x + dx * gate.width / 2)
+    y = round(gate.center_y + dy * gate.height / 2)
+    locations[gate.output.id] = (x, y)
+
+    depth = _INPUT_DEPTHS[gate.type]
+    offsets = [0] if gate.type is ObjectType.NOT_GATE else _input_offsets(len(gate.inputs))
+
+    # the inputs are spread across the facing, behind the output
+    for pin, offset in zip(gate.inputs, offsets):
+        locations[pin.id] = (x - dx * depth - dy * offset, y - dy * depth + dx * offset)
+
+    return facing, x, y
+
+
+def _place_io(io_result: IO, locations: dict[int, tuple[int, int]]) -> tuple[str, int, int]:
+    """
+    Gets the facing and the location of the pin of a toggle or probe, and adds it to the locations.
+    A toggle faces the way its gate does and a probe the other way, both towards the gate.
+    """
+
+    x = round(io_result.center_x)
+    y = round(io_result.center_y)
+    locations[io_result.pin.id] = (x, y)
+
+    index = io_result.rotation // 90 % 4
+    if io_result.type is ObjectType.PROBE:
+        index = (index + 2) % 4
+
+    return _FACINGS[index], x, y
+
+
+def _get_shift(locations: Iterable[tuple[int, int]]) -> tuple[int, int]:
+    """
+    Gets how far to move the circuit for every pin to be at least MARGIN right of and below the top
+    left corner of the canvas, which leaves room for the bodies of the gates and pins. A circuit that
+    is there already stays where it is.
+    """
+
+    xs, ys = zip(*locations) if locations else ((MARGIN,), (MARGIN,))
+
+    return max(0, MARGIN - min(xs)), max(0, MARGIN - min(ys))
+
+
+def _input_offsets(count: int) -> list[int]:
+    """
+    Gets the offsets of the inputs of a gate across its facing, the way Logisim spaces them on a
+    size 50 gate: 20 apart for up to 3 inputs, 10 apart for more, leaving the middle free for an
+    even number of inputs.
+    """
+
+    start, spacing = (-10, 20) if count <= 3 else (-5, 10)
+
+    if count % 2:
+        return [start * (count - 1) + spacing * index for index in range(count)]
+
+    return [
+        start * count + spacing * index + (spacing if index >= count // 2 else 0)
+        for index in range(count)
+    ]
+
+
+class _Wiring:
+    """
+    The horizontal and vertical segments routed so far and the ends of every segment and pin, by row
+    and by column, each with its net.
+    """
+
+    def __init__(self) -> None:
+        self.rows = defaultdict(list)
+        self.columns = defaultdict(list)
+
+        # the x of every end on a row and the y of every end on a column
+        self.row_ends = defaultdict(list)
+        self.column_ends = defaultdict(list)
+
+    def add_point(self, point: tuple[int, int], net: int) -> None:
+        """
+        Adds a pin, or the end of a segment.
+        """
+
+        x, y = point
+        self.row_ends[y].append((x, net))
+        self.column_ends[x].append((y, net))
+
+    def add(self, segments: list[tuple[tuple[int, int], tuple[int, int]]], net: int) -> None:
+        """
+        Adds the segments of a wire.
+        """
+
+        for (x1, y1), (x2, y2) in segments:
+            if y1 == y2:
+                self.rows[y1].append((min(x1, x2), max(x1, x2), net))
+            else:
+                self.columns[x1].append((min(y1, y2), max(y1, y2), net))
+
+            self.add_point((x1, y1), net)
+            self.add_point((x2, y2), net)
+
+    def is_free(self, segments: list[tuple[tuple[int, int], tuple[int, int]]], net: int) -> bool:
+        """
+        Whether the segments of a wire touch nothing of another net, see _is_free().
+        """
+
+        return all(self._is_free(segment, net) for segment in segments)
+
+    def _is_free(self, segment: tuple[tuple[int, int], tuple[int, int]], net: int) -> bool:
+        """
+        Whether a segment touches nothing of another net: no segment along the same line overlaps
+        it, no end or pin is on it, and neither of its ends is on a segment across it. Segments
+        that only cross do not connect.
+        """
+
+        (x1, y1), (x2, y2) = segment
+
+        if y1 == y2:
+            line, low, high = y1, min(x1, x2), max(x1, x2)
+            along, ends, across = self.rows, self.row_ends, self.columns
+        else:
+            line, low, high = x1, min(y1, y2), max(y1, y2)
+            along, ends, across = self.columns, self.column_ends, self.rows
+
+        if line in along and any(
+            other != net and start <= high and low <= end for start, end, other in along[line]
+        ):
+            return False
+
+        if line in ends and any(other != net and low <= at <= high for at, other in ends[line]):
+            return False
+
+        for at in (low, high):
+            if at in across and any(
+                other != net and start <= line <= end for start, end, other in across[at]
+            ):
+                return False
+
+        return True
+
+
+def _route(
+    start: tuple[int, int], end: tuple[int, int], net: int, wiring: _Wiring
+) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+    """
+    Gets the horizontal and vertical segments of a wire between two pins and adds them to the wiring.
+    The first route that touches no other net is taken: straight, turning in the column nearest the
+    middle, or across a row nearest the middle between columns near either end. If there is none, it
+    turns in the middle column.
+
+    Args:
+        start (tuple[int, int]): The location of the main input.
+        end (tuple[int, int]): The location of the main output.
+        net (int): The main input, which the branches of a fanned out net share.
+        wiring (_Wiring): The segments and pins of the wires routed so far.
+
+    Returns:
+        list[tuple[tuple[int, int], tuple[int, int]]]: The segments, from start to end.
+    """
+
+    if start == end:
+        return []
+
+    segments = _find_route(start, end, net, wiring)
+    wiring.add(segments, net)
+
+    return segments
+
+
+def _find_route(
+    start: tuple[int, int], end: tuple[int, int], net: int, wiring: _Wiring
+) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+    """
+    Gets the first free route of a wire, see _route().
+    """
+
+    (x1, y1), (x2, y2) = start, end
+    middle = _snap((x1 + x2) / 2)
+    straight = x1 == x2 or y1 == y2
+
+    # no route is free if a pin already touches another net, e.g. one driven by two wires
+    if not wiring.is_free([(start, start), (end, end)], net):
+        return [(start, end)] if straight else _path([start, (middle, y1), (middle, y2), end])
+
+    if straight and wiring.is_free([(start, end)], net):
+        return [(start, end)]
+
+    # a wire straight across turns back onto itself in any column
+    if y1 != y2:
+        for column in _around(middle, COLUMN_SEARCH):
+            segments = _path([start, (column, y1), (column, y2), end])
+            if wiring.is_free(segments, net):
+                return segments
+
+    for row in _around(_snap((y1 + y2) / 2), DETOUR_SEARCH):
+        for first in _around(_snap(x1), DETOUR_SEARCH):
+            leaving = _path([start, (first, y1), (first, row)])
+            if not wiring.is_free(leaving, net):
+                continue
+
+            for second in _around(_snap(x2), DETOUR_SEARCH):
+                arriving = _path([(first, row), (second, row), (second, y2), end])
+                if wiring.is_free(arriving, net):
+                    return leaving + arriving
+
+    return [(start, end)] if straight else _path([start, (middle, y1), (middle, y2), end])
+
+
+def _path(points: list[tuple[int, int]]) -> list[tuple[tuple[int, int], tuple[int, int]]]:
+    """
+    Gets the segments between consecutive points, leaving out the empty ones.
+    """
+
+    return [(p1, p2) for p1, p2 in zip(points, points[1:]) if p1 != p2]
+
+
+def _around(center: int, steps: int) -> Iterator[int]:
+    """
+    Gets a grid line, then the ones next to it on either side up to steps away, nearest first.
+    """
+
+    yield center
+    for step in range(1, steps + 1):
+        yield center + step * GRID_SIZE
+        yield center - step * GRID_SIZE
+
+
+def _snap(value: float) -> int:
+    """
+    Gets the nearest grid line.
+    """
+
+    return round(value / GRID_SIZE) * GRID_SIZE
@@ -0,0 +1,187 @@
+from sketchlogic.circuit import Gate, IO, Wire, GATES, ObjectType
+from sketchlogic.registry import CircuitRegistry
+import sketchlogic.geometry as geometry
+
+
+def straighten(model_results: list[Gate], registry: CircuitRegistry, min_wire_length: int, debug: bool) -> int:
+    """
+    Straightens the models and io if they have a 2 point wire in-between. The connections are
+    looked up in the registry the models, io and wires are in.
+
+    Starting from every gate in order, the gates and io connected to it through 2 point wires are
+    moved in line with it, then the ones connected to those, and so on (depth first). Only a NotGate
+    or a 2 input gate moves the gates wired to it, a link from any other gate is left for the gate
+    at its other end to line it up from. Every link is followed once, so a gate already moved in
+    line from an earlier gate is not moved again from a later one, and chains and loops of any
+    length take linear time.
+
+    Args:
+        model_results (list[Gate]): The scaled and translated gates, see converter.transform.apply().
+        registry (CircuitRegistry): The registry the gates, io and wires of the circuit are in.
+        min_wire_length (int): The minimum length to ensure for dual-point wires.
+        debug (bool): Whether to print debug information.
+
+    Returns:
+        int: The number of connections straightened.
+    """
+
+    links = _get_links(model_results, registry)
+
+    fixed_pins = set()
+    straightened_count = 0
+
+    for start in model_results:
+        # the gates being walked and the pins each has left, the way the recursion would hold them
+        stack = [(start, iter(start.pins()))]
+
+        while stack:
+            component, pins = stack[-1]
+            pin = next(pins, None)
+            if pin is None:
+                stack.pop()
+                continue
+
+            if pin.id in fixed_pins or pin.id not in links:
+                continue
+
+            wire, attached_pin_id, attached = links[pin.id]
+            if attached_pin_id in fixed_pins:
+                continue
+
+            if attached.type in GATES:
+                # the link is left for the gate at the other end to line this one up with
+                if not _align_gate(component, attached, wire, min_wire_length):
+                    continue
+                stack.append((attached, iter(attached.pins())))
+            else:
+                _align_io(component, pin.id, attached, wire, min_wire_length)
+
+            fixed_pins.add(pin.id)
+            fixed_pins.add(attached_pin_id)
+            straightened_count += 1
+
+    if debug:
+        print()
+        print(f"sketchlogic.converter.straightener:")
+        print(f"Straightened {straightened_count} connections.")
+
+    return straightened_count
+
+
+def _get_links(model_results: list[Gate], registry: CircuitRegistry) -> dict[int, tuple[Wire, int, Gate | IO]]:
+    """
+    Gets the 2 point wire of every gate pin that has one, as pin id -> (wire, the pin at its other
+    end, the gate or io of that pin). A pin with several wires only links through the first one.
+    """
+
+    links = {}
+    for component in model_results:
+        for pin in component.pins():
+            wire = registry.wire_at(pin.id)
+            if wire is None or len(wire.points) != 2:
+                continue
+
+            attached_pin_id = wire.main_output if wire.main_input == pin.id else wire.main_input
+            attached = registry.owner(attached_pin_id)
+
+            # a wire back into the same gate has nothing to line up
+            if attached is None or attached is component:
+                continue
+
+            links[pin.id] = (wire, attached_pin_id, attached)
+
+    return links
+
+
+def _measure(wire: Wire, min_wire_length: int) -> tuple[float, bool]:
+    """
+    Gets the length to keep between the ends of a 2 point wire, and whether it runs vertically.
+    """
+
+    p1, p2 = wire.points
+
+    wire_length = geometry.distance(p1, p2)
+    additional_length = wire_length if wire_length > min_wire_length else min_wire_length
+
+    return additional_length, abs(p1[0] - p2[0]) < abs(p1[1] - p2[1])
+
+
+def _align_gate(component: Gate, attached: Gate, wire: Wire, min_wire_length: int) -> bool:
+    """
+    Moves a gate in line with the NotGate or 2 input gate it is wired to. Other gates leave it as is.
+
+    Returns:
+        bool: Whether the gate was moved.
+    """
+
+    if not (component.type is ObjectType.NOT_GATE or len(component.inputs) == 2):
+        return False
+
+    additional_length, is_vertical = _measure(wire, min_wire_length)
+
+    if is_vertical:
+        attached.center_x = component.center_x
+        if component.center_y - attached.center_y > 0:
+            attached.center_y = component.center_y - 10 - additional_length
+        else:
+            attached.center_y = component.center_y + 50 + additional_length
+
+    else:
+        attached.center_y = component.center_y
+        if component.center_x - attached.center_x > 0:
+            attached.center_x = component.center_x - 60 - additional_length
+        else:
+            attached.center_x = component.center_x + 60 + additional_length
+
+    return True
+
+
+def _align_io(component: Gate, pin_id: int, io: IO, wire: Wire, min_wire_length: int) -> None:
+    """
+    Moves a toggle or probe in line with the pin of the gate it is wired to.
+    """
+
+    additional_length, is_vertical = _measure(wire, min_wire_length)
+
+    if component.type is ObjectType.NOT_GATE:
+        if is_vertical:
+            io.center_x = component.center_x
+            if component.center_y - io.center_y > 0:
+                io.center_y = component.center_y - 30 - additional_length - 20
+            else:
+                io.center_y = component.center_y + 30 + additional_length + 20
+
+        else:
+            io.center_y = component.center_y
+            if component.center_x - io.center_x > 0:
+                io.center_x = component.center_x - 30 - additional_length - 20
+            else:
+                io.center_x = component.center_x + 30 + additional_length + 20
+
+        return
+
+    num_inputs = len(component.inputs)
+
+    # the output pin sits in the middle of its side
+    pin_idx_relative = (num_inputs - 1) / 2
+    for index, pin in enumerate(component.inputs):
+        if pin.id == pin_id:
+            pin_idx_relative = index
+            break
+
+    comp_y = component.center_y - (component.height / 2)
+    comp_x = component.center_x - (component.width / 2)
+
+    if is_vertical:
+        io.center_x = comp_x + (20 * pin_idx_relative) + 10
+        if component.center_y - io.center_y > 0:
+            io.center_y = comp_y - 40 - additional_length + 10
+        else:
+            io.center_y = comp_y + 20 + (num_inputs * 20) + additional_length + 10
+
+    else:
+        io.center_y = comp_y + (20 * pin_idx_relative) + 10
+        if component.center_x - io.center_x > 0:
+            io.center_x = comp_x - 40 - additional_length + 10
+        else:
+            io.center_x = comp_x + 20 + (num_inputs * 20) + additional_length + 10
@@ -0,0 +1,82 @@
+"""
+Fits the circuit onto the grid of the output in a single pass.
+
+The coordinates of every gate, IO and wire point are gathered into one array. The scale and the
+translation are computed from the bounds of the boxes, then applied to the whole array at once and
+snapped to the grid, and the results are scattered back into the records. The arithmetic is the same
+as one point at a time: scale and round, translate, then round to the nearest grid line.
+"""
+
+from sketchlogic.circuit import Gate, IO, Wire, ObjectType
+import itertools
+import numpy
+
+
+def apply(
+    model_results: list[Gate], io_results: list[IO], wires: list[Wire],
+    per_component: int, per_io: int, center_x: float, center_y: float, grid_size: int = 10
+) -> None:
+    """
+    Scales, translates and snaps the circuit in place, and gives the gates and io their output sizes.
+
+    Args:
+        model_results (list[Gate]): The gates, in pixels.
+        io_results (list[IO]): The toggles and probes, in pixels.
+        wires (list[Wire]): The wires, in pixels.
+        per_component (int): How long the longer side of the circuit gets per gate.
+        per_io (int): How long the longer side of the circuit gets per toggle or probe.
+        center_x (float): Where the middle of the gates ends up.
+        center_y (float): Where the middle of the gates ends up.
+        grid_size (int): The spacing of the grid everything is snapped to.
+    """
+
+    # the io and the wires all hang off the gates, without gates there is nothing to place
+    if not model_results:
+        return
+
+    components = model_results + io_results
+
+    boxes = numpy.array(
+        [(component.center_x, component.center_y, component.width, component.height) for component in components],
+        dtype=numpy.float64
+    )
+    lows = boxes[:, :2] - boxes[:, 2:] / 2
+    highs = boxes[:, :2] + boxes[:, 2:] / 2
+
+    # the scale comes from the bounds of everything, the translation from the bounds of the gates only
+    required_max_side = len(model_results) * per_component + len(io_results) * per_io
+    scale_factor = required_max_side / (highs.max(axis=0) - lows.min(axis=0)).max()
+
+    gate_count = len(model_results)
+    middle = (highs[:gate_count].max(axis=0) + lows[:gate_count].min(axis=0)) / 2
+    translate = (center_x, center_y) - middle * scale_factor
+
+    points = numpy.fromiter(
+        itertools.chain.from_iterable(itertools.chain.from_iterable(wire.points for wire in wires)),
+        dtype=numpy.float64
+    )
+    coordinates = numpy.concatenate([boxes[:, :2], points.reshape(-1, 2)])
+
+    coordinates = numpy.round((numpy.round(coordinates * scale_factor) + translate) / grid_size) * grid_size
+
+    # flat columns of python ints, the points are zipped back into tuples without a list per point
+    xs, ys = coordinates.astype(numpy.int64).T.tolist()
+
+    for component, x, y in zip(components, xs, ys):
+        component.center_x = x
+        component.center_y = y
+
+    for gate in model_results:
+        if gate.type is ObjectType.NOT_GATE:
+            gate.width = gate.height = 40
+        else:
+            gate.width = gate.height = len(gate.inputs) * 20
+
+    for io in io_results:
+        io.width = io.height = 20
+
+    start = len(components)
+    for wire in wires:
+        end = start + len(wire.points)
+        wire.points = list(zip(xs[start:end], ys[start:end]))
+        start = end
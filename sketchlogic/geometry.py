@@ -0,0 +1,163 @@
+"""
+Geometry kernels shared by the connector and the converter.
+
+The kernels work on whole arrays of points at once instead of one point per call. They do the
+same arithmetic as the per point versions they replace, in the same order, so the results match
+them exactly.
+"""
+
+import math
+import numpy
+
+
+# the corners of every side of a box as multiples of its width and height from its top left corner,
+# in the order left, top, right, bottom (the order a quarter turn moves a side along)
+SIDES = ("left", "top", "right", "bottom")
+_SIDE_CORNERS = numpy.array([
+    [[0, 0], [0, 1]],
+    [[0, 0], [1, 0]],
+    [[1, 0], [1, 1]],
+    [[0, 1], [1, 1]],
+], dtype=numpy.float64)
+
+
+def distance(p1: tuple[float, float], p2: tuple[float, float]) -> float:
+    """
+    Calculates the distance from a point to a point.
+
+    Args:
+        p1 (tuple[float, float]): The first point.
+        p2 (tuple[float, float]): The second point.
+
+    Returns:
+        float: The distance from the first point to the second point.
+    """
+
+    return math.hypot(p1[0] - p2[0], p1[1] - p2[1])
+
+
+def distances(points: numpy.ndarray, point: tuple[float, float]) -> numpy.ndarray:
+    """
+    Calculates the distance from many points to a point.
+
+    Args:
+        points (numpy.ndarray): The (N, 2) points to measure from.
+        point (tuple[float, float]): The point to measure to.
+
+    Returns:
+        numpy.ndarray: The N distances.
+    """
+
+    points = numpy.asarray(points, dtype=numpy.float64)
+    return numpy.hypot(points[:, 0] - point[0], points[:, 1] - point[1])
+
+
+def segment_distances(
+    points: numpy.ndarray, p1: tuple[float, float], p2: tuple[float, float]
+) -> numpy.ndarray:
+    """
+    Calculates the distance from many points to a line segment.
+
+    Args:
+        points (numpy.ndarray): The (N, 2) points to measure from.
+        p1 (tuple[float, float]): One endpoint of the segment.
+        p2 (tuple[float, float]): The other endpoint of the segment.
+
+    Returns:
+        numpy.ndarray: The N distances.
+    """
+
+    points = numpy.asarray(points, dtype=numpy.float64)
+    x, y = points[:, 0], points[:, 1]
+    x1, y1 = p1
+    x2, y2 = p2
+
+    dx = x2 - x1
+    dy = y2 - y1
+    length_sq = dx * dx + dy * dy
+
+    if length_sq == 0:
+        return numpy.hypot(x - x1, y - y1)
+
+    t = numpy.clip(((x - x1) * dx + (y - y1) * dy) / length_sq, 0.0, 1.0)
+    return numpy.hypot(x - (x1 + t * dx), y - (y1 + t * dy))
+
+
+def box_side(
+    side: str, cx: float, cy: float, w: float, h: float, rotation: int
+) -> tuple[tuple[float, float], tuple[float, float]]:
+    """
+    Gets a side of a rotated box as its two corners. The sides are named as if the box was not rotated.
+
+    Args:
+        side (str): One of SIDES.
+        cx (float): The x coordinate of the center of the box.
+        cy (float): The y coordinate of the center of the box.
+        w (float): The width of the box.
+        h (float): The height of the box.
+        rotation (int): The rotation of the box in degrees, a multiple of 90.
+
+    Returns:
+        tuple[tuple[float, float], tuple[float, float]]: The two corners of the side.
+    """
+
+    corners = _SIDE_CORNERS[(SIDES.index(side.lower()) + rotation // 90) % 4]
+    x = cx - w / 2
+    y = cy - h / 2
+
+    (x1, y1), (x2, y2) = corners * (w, h) + (x, y)
+    return (float(x1), float(y1)), (float(x2), float(y2))
+
+
+def divide(p1: tuple[float, float], p2: tuple[float, float], count: int) -> numpy.ndarray:
+    """
+    Divides a segment into equal parts and gets the middle of every part, e.g. the pins along a side.
+
+    Args:
+        p1 (tuple[float, float]): One endpoint of the segment.
+        p2 (tuple[float, float]): The other endpoint of the segment.
+        count (int): The number of parts.
+
+    Returns:
+        numpy.ndarray: The (count, 2) middles of the parts, from p1 to p2.
+    """
+
+    if count == 0:
+        return numpy.empty((0, 2), dtype=numpy.float64)
+
+    step = (numpy.asarray(p2, dtype=numpy.float64) - p1) / count
+    return p1 + step * (numpy.arange(count) + 0.5)[:, None]
+
+
+def outer_ends(
+    firsts: numpy.ndarray, seconds: numpy.ndarray, lasts: numpy.ndarray, second_lasts: numpy.ndarray,
+    centers: numpy.ndarray
+) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Gets the end of every polyline that is farther from a center, and the direction it points in.
+
+    Args:
+        firsts (numpy.ndarray): The (N, 2) first points of the polylines.
+        seconds (numpy.ndarray): The (N, 2) second points.
+        lasts (numpy.ndarray): The (N, 2) last points.
+        second_lasts (numpy.ndarray): The (N, 2) second to last points.
+        centers (numpy.ndarray): The (N, 2) centers to measure from.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: The (N, 2) outer ends, and the (N, 2) steps from the
+            point before each of them to it. The last end is taken when both are as far.
+    """
+
+    firsts, seconds, lasts, second_lasts, centers = (
+        numpy.asarray(array, dtype=numpy.float64).reshape(-1, 2)
+        for array in (firsts, seconds, lasts, second_lasts, centers)
+    )
+
+    first_is_outer = (
+        numpy.hypot(*(firsts - centers).T) > numpy.hypot(*(lasts - centers).T)
+    )[:, None]
+
+    ends = numpy.where(first_is_outer, firsts, lasts)
+    before = numpy.where(first_is_outer, seconds, second_lasts)
+
+    return ends, ends - before
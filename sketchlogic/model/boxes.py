@@ -0,0 +1,61 @@
+"""
+Box helpers shared by the inference backends. These only depend on numpy.
+"""
+
+import numpy
+
+
+def xywh_to_xyxy(boxes: numpy.ndarray) -> numpy.ndarray:
+    """
+    Converts center based boxes to corner based boxes.
+
+    Args:
+        boxes (numpy.ndarray): (N, 4) array of CenterX, CenterY, Width, Height.
+
+    Returns:
+        numpy.ndarray: (N, 4) array of x1, y1, x2, y2.
+    """
+
+    half = boxes[:, 2:4] / 2
+    return numpy.concatenate([boxes[:, 0:2] - half, boxes[:, 0:2] + half], axis=1)
+
+
+def nms(
+    boxes: numpy.ndarray, scores: numpy.ndarray, iou: float, max_det: int = 300, by_smaller: bool = False
+) -> numpy.ndarray:
+    """
+    Class agnostic non-maximum suppression, the same as agnostic_nms=True in ultralytics.
+
+    Args:
+        boxes (numpy.ndarray): (N, 4) array of x1, y1, x2, y2.
+        scores (numpy.ndarray): (N,) array of confidences.
+        iou (float): Boxes overlapping a kept box by more than this are suppressed.
+        max_det (int): The maximum number of boxes to keep.
+        by_smaller (bool): Measure the overlap as intersection over the smaller box instead of IoU.
+            This also suppresses partial boxes that lie inside a complete one.
+
+    Returns:
+        numpy.ndarray: Indices of the kept boxes, highest score first.
+    """
+
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    order = numpy.argsort(-scores, kind="stable")
+
+    keep = []
+    while order.size > 0 and len(keep) < max_det:
+        best = order[0]
+        keep.append(best)
+
+        rest = order[1:]
+        inter_w = numpy.clip(numpy.minimum(x2[best], x2[rest]) - numpy.maximum(x1[best], x1[rest]), 0, None)
+        inter_h = numpy.clip(numpy.minimum(y2[best], y2[rest]) - numpy.maximum(y1[best], y1[rest]), 0, None)
+        inter = inter_w * inter_h
+        if by_smaller:
+            overlap = inter / (numpy.minimum(areas[best], areas[rest]) + 1e-9)
+        else:
+            overlap = inter / (areas[best] + areas[rest] - inter + 1e-9)
+
+        order = rest[overlap <= iou]
+
+    return numpy.array(keep, dtype=numpy.int64)
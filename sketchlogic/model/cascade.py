@@ -0,0 +1,96 @@
+"""
+Coarse to fine detection.
+
+Most sketches are clean and spacious, so running the model at a small input size finds every gate
+with high confidence at a fraction of the cost. Only when the coarse pass looks unsure (low
+confidences, gates too small at that scale, or nothing found at all) is the image run again at
+the full training size.
+"""
+
+from sketchlogic.model.detections import Detections
+import numpy
+
+
+class Cascade:
+    """
+    Runs the coarse pass and decides when to escalate. Keeps count of how often it escalates.
+    """
+
+    def __init__(
+        self,
+        coarse_size: int = 512,
+        fine_size: int = 1024,
+        min_confidence: float = 0.5,
+        min_box_size: int = 24,
+    ) -> None:
+        """
+        Args:
+            coarse_size (int): The model input size of the first pass. Must be a multiple of 32.
+            fine_size (int): The model input size to escalate to, the imgsz the model was trained with.
+            min_confidence (float): Escalate if any coarse box is less confident than this.
+            min_box_size (int): Escalate if any coarse box has a side shorter than this, measured in
+                model input pixels of the coarse pass.
+        """
+
+        self.coarse_size = coarse_size
+        self.fine_size = fine_size
+        self.min_confidence = min_confidence
+        self.min_box_size = min_box_size
+
+        self.runs = 0
+        self.escalations = 0
+
+    def detect(self, image: numpy.ndarray, model, debug: bool = False) -> Detections:
+        """
+        Detects the gates in the image, escalating to the fine pass if needed.
+
+        Args:
+            image (numpy.ndarray): The BGR image to run the model on.
+            model (Detector): A model returned by model.controller.load().
+            debug (bool): Whether to print why the cascade escalated.
+
+        Returns:
+            Detections: The detections of the pass that was kept.
+        """
+
+        self.runs += 1
+        coarse = model.detect(image, imgsz=self.coarse_size)
+
+        reason = self._escalation_reason(coarse, max(image.shape[:2]))
+        if reason is None:
+            return coarse
+
+        self.escalations += 1
+
+        if debug:
+            print()
+            print(f"sketchlogic.model.cascade:")
+            print(f"Escalated to {self.fine_size}: {reason}")
+            print(f"Escalation rate: {self.escalations}/{self.runs} ({self.escalation_rate() * 100:.1f}%)")
+
+        return model.detect(image, imgsz=self.fine_size)
+
+    def escalation_rate(self) -> float:
+        """
+        Gets the share of the runs that needed the fine pass.
+        """
+
+        return self.escalations / self.runs if self.runs else 0.0
+
+    def _escalation_reason(self, coarse: Detections, image_side: int) -> str | None:
+        """
+        Gets why the coarse detections are not good enough, or None if they are.
+        """
+
+        if len(coarse) == 0:
+            return "no gates found"
+
+        if coarse.confidences.min() < self.min_confidence:
+            return f"confidence {coarse.confidences.min():.2f} < {self.min_confidence}"
+
+        # the letterbox scales the longest image side to the model input size
+        smallest_side = coarse.sizes.min() * self.coarse_size / image_side
+        if smallest_side < self.min_box_size:
+            return f"gate side {smallest_side:.0f}px < {self.min_box_size}px"
+
+        return None
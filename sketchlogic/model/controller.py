@@ -1,37 +1,218 @@
 from pathlib import Path
+from sketchlogic.model.detections import Detections
+from sketchlogic.model.cascade import Cascade
+from sketchlogic.artifacts import RunArtifacts, snapshot
 import sketchlogic.model.inference as inference
+import sketchlogic.model.tiling as tiling
 import sketchlogic.model.utils as utils
+import sketchlogic.cache as cache
+import functools
+import importlib
 import numpy
 import cv2
 import sys
 
 
-def run(input_image: numpy.ndarray, debug: bool = False) -> tuple[list, int]:
+BACKENDS = {
+    "ultralytics": ("sketchlogic.model.inference", "SketchLogic.pt"),
+    "onnx": ("sketchlogic.model.onnx_inference", "SketchLogic.onnx"),
+}
+
+
+class Detector:
+    """
+    A model loaded once and bound to the inference backend that runs it.
+    """
+
+    def __init__(self, backend: str, model_path: Path) -> None:
+        """
+        Args:
+            backend (str): The backend module, one of BACKENDS.
+            model_path (Path): The path to the model file for that backend.
+        """
+
+        self.backend = backend
+        self.model_path = model_path
+        self.module = importlib.import_module(BACKENDS[backend][0])
+        self.model = self.module.load(model_path)
+
+    @functools.cached_property
+    def model_hash(self) -> str:
+        """
+        The hash of the model file, for the keys of a ResultCache. Read on first use, so runs
+        without a cache never hash the model.
+        """
+
+        return cache.file_hash(self.model_path)
+
+    def predict(self, image: numpy.ndarray) -> tuple[list, int]:
+        """
+        Runs the loaded model on a single image. See inference.predict().
+        """
+
+        return self.module.predict(image, self.model)
+
+    def predict_batch(self, images: list[numpy.ndarray], max_batch_size: int = 8) -> list[tuple[list, int]]:
+        """
+        Runs the loaded model on many images at once. See inference.predict_batch().
+        """
+
+        return self.module.predict_batch(images, self.model, max_batch_size)
+
+    def detect(self, image: numpy.ndarray, imgsz: int | None = None) -> Detections:
+        """
+        Runs the loaded model on a single image and returns the columnar detections. See inference.detect().
+        """
+
+        return self.module.detect(image, self.model, imgsz=imgsz)
+
+    def detect_batch(
+        self, images: list[numpy.ndarray], max_batch_size: int = 8, imgsz: int | None = None
+    ) -> list[Detections]:
+        """
+        Runs the loaded model on many images and returns the columnar detections. See inference.detect_batch().
+        """
+
+        return self.module.detect_batch(images, self.model, max_batch_size, imgsz=imgsz)
+
+    def detect_tiled(self, image: numpy.ndarray, tile_size: int) -> Detections:
+        """
+        Runs the loaded model over the inked tiles of a large image. See tiling.detect().
+        """
+
+        return tiling.detect(image, self, tile_size=tile_size, overlap=tile_size // 4)
+
+
+def run(
+    input_image: numpy.ndarray,
+    model: Detector | None = None,
+    tile_size: int | None = None,
+    cascade: Cascade | None = None,
+    debug: bool = False,
+    artifacts: RunArtifacts | None = None,
+) -> Detections:
     """
     Controller for the model module.
+
+    Args:
+        input_image (numpy.ndarray): The enhanced image to run the model on.
+        model (Detector | None): A model returned by load(). If None, the model is loaded for this call only.
+        tile_size (int | None): If given, images larger than this are detected tile by tile at full
+            resolution instead of being downsized into a single model input. See tiling.detect().
+        cascade (Cascade | None): If given, the image is first run at a small input size and only run
+            again at full size when the cascade is unsure about the result. See cascade.Cascade.
+        debug (bool): Whether to print logs.
+        artifacts (RunArtifacts | None): If given, the detections are drawn on the image and saved
+            as debug artifacts of the run.
+
+    Returns:
+        Detections: The detected gates. See inference.to_results() for their record form.
+    """
+
+    if model is None:
+        model = load()
+
+    # grayscale images are passed on as they are. The onnx backend expands them to color at its input
+    # size, the ultralytics backend at full size before its own letterboxing, see inference.detect_batch()
+    if tile_size is not None and max(input_image.shape[:2]) > tile_size:
+        detections = model.detect_tiled(input_image, tile_size)
+    elif cascade is not None:
+        detections = cascade.detect(input_image, model, debug=debug)
+    else:
+        detections = model.detect(input_image)
+
+    if artifacts is not None:
+        _save_debug(artifacts, input_image, detections)
+
+    return detections
+
+
+def run_batch(
+    input_images: list[numpy.ndarray],
+    model: Detector | None = None,
+    max_batch_size: int = 8,
+    debug: bool = False,
+    artifacts: list[RunArtifacts] | None = None,
+) -> list[Detections]:
+    """
+    Controller for the model module on many images, running them through the model in batches.
+
+    Args:
+        input_images (list[numpy.ndarray]): The enhanced images to run the model on.
+        model (Detector | None): A model returned by load(). If None, the model is loaded for this call only.
+        max_batch_size (int): The maximum number of images per forward pass.
+        debug (bool): Whether to print logs.
+        artifacts (list[RunArtifacts] | None): If given, the debug artifacts of the run of every image.
+
+    Returns:
+        list[Detections]: The detected gates of every image, in order.
+    """
+
+    if model is None:
+        model = load()
+    outputs = model.detect_batch(input_images, max_batch_size)
+
+    if artifacts is not None:
+        for run_artifacts, input_image, detections in zip(artifacts, input_images, outputs):
+            _save_debug(run_artifacts, input_image, detections)
+
+    return outputs
+
+
+def _save_debug(artifacts: RunArtifacts, image: numpy.ndarray, detections: Detections) -> None:
+    """
+    Queues the detections drawn on the image, and the detections themselves, as debug artifacts.
     """
 
-    if len(input_image.shape) == 2:
-        input_image = cv2.cvtColor(input_image, cv2.COLOR_GRAY2BGR)
+    artifacts.save("model_test.png", _render_debug, image, detections)
+    artifacts.save("model_test.json", lambda: snapshot(inference.to_results(detections)[0]))
+
+
+def _render_debug(image: numpy.ndarray, detections: Detections) -> numpy.ndarray:
+    """
+    Draws the detections on a color copy of the image.
+    """
+
+    results = snapshot(inference.to_results(detections)[0])
+
+    if len(image.shape) == 2:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    else:
+        image = image.copy()
+
+    utils.draw_results(image, results)
+    return image
+
+
+def load(model_path: Path | None = None, backend: str = "ultralytics") -> Detector:
+    """
+    Loads the model so it can be passed to run() repeatedly.
+
+    Args:
+        model_path (Path | None): The path to the model file. Defaults to the bundled model of the backend.
+        backend (str): The inference backend, "ultralytics" or "onnx".
+
+    Raises:
+        ValueError: If the backend is not supported.
+    """
 
-    model_path = _model_path()
-    results, next_id = inference.run(input_image, model_path)
+    if backend not in BACKENDS:
+        raise ValueError(f"model.controller.load(): unsupported backend {backend}, choose from {list(BACKENDS)}.")
 
-    if debug:
-        utils.draw_results(input_image, results)
-        utils.save_image(input_image, Path("model_test.png"))
-        utils.save_json(results, Path("model_test.json"))
+    if model_path is None:
+        model_path = _model_path(backend)
 
-    return results, next_id
+    return Detector(backend, model_path)
 
 
-def _model_path() -> Path:
+def _model_path(backend: str) -> Path:
     """
-    Returns the path to the model file.
+    Returns the path to the model file of the given backend.
     """
 
+    file_name = BACKENDS[backend][1]
     meipass = getattr(sys, "_MEIPASS", None)
 
     if meipass:
-        return Path(meipass) / "SketchLogic.pt"
-    return Path("sketchlogic/model/SketchLogic.pt")
+        return Path(meipass) / file_name
+    return Path("sketchlogic/model") / file_name
@@ -0,0 +1,124 @@
+import numpy
+
+
+class Detections:
+    """
+    Columnar detection results. Every field is a numpy array with one row per box, so the results
+    can be filtered, offset and merged without looping over python dicts. They are turned into the
+    gate records by inference.to_results() once ids and pins are needed.
+    """
+
+    def __init__(
+        self,
+        centers: numpy.ndarray,
+        sizes: numpy.ndarray,
+        class_ids: numpy.ndarray,
+        confidences: numpy.ndarray,
+    ) -> None:
+        """
+        Args:
+            centers (numpy.ndarray): (N, 2) float32 array of CenterX, CenterY in image pixels.
+            sizes (numpy.ndarray): (N, 2) float32 array of Width, Height in image pixels.
+            class_ids (numpy.ndarray): (N,) int64 array of model class IDs.
+            confidences (numpy.ndarray): (N,) float32 array of confidences.
+        """
+
+        self.centers = centers
+        self.sizes = sizes
+        self.class_ids = class_ids
+        self.confidences = confidences
+
+        self.type_ids = class_ids // 4          # see inference.class_to_name()
+        self.rotations = (class_ids % 4) * 90   # see inference.class_to_rotation()
+
+    @classmethod
+    def from_xywh(cls, boxes: numpy.ndarray, class_ids: numpy.ndarray, confidences: numpy.ndarray) -> "Detections":
+        """
+        Builds the detections from an (N, 4) CenterX, CenterY, Width, Height array as given by the models.
+        """
+
+        boxes = numpy.asarray(boxes, dtype=numpy.float32).reshape(-1, 4)
+
+        return cls(
+            boxes[:, 0:2].copy(),
+            boxes[:, 2:4].copy(),
+            numpy.asarray(class_ids, dtype=numpy.int64).reshape(-1),
+            numpy.asarray(confidences, dtype=numpy.float32).reshape(-1),
+        )
+
+    @classmethod
+    def empty(cls) -> "Detections":
+        """
+        Builds detections without any boxes.
+        """
+
+        return cls.from_xywh(numpy.zeros((0, 4)), numpy.zeros(0), numpy.zeros(0))
+
+    @classmethod
+    def concatenate(cls, detections: list["Detections"]) -> "Detections":
+        """
+        Joins many detections into one, keeping their order.
+        """
+
+        if not detections:
+            return cls.empty()
+
+        return cls(
+            numpy.concatenate([d.centers for d in detections]),
+            numpy.concatenate([d.sizes for d in detections]),
+            numpy.concatenate([d.class_ids for d in detections]),
+            numpy.concatenate([d.confidences for d in detections]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.class_ids)
+
+    def __getitem__(self, index) -> "Detections":
+        """
+        Selects boxes with any numpy index (a mask, an index array or a slice).
+        """
+
+        return Detections(self.centers[index], self.sizes[index], self.class_ids[index], self.confidences[index])
+
+    def xywh(self) -> numpy.ndarray:
+        """
+        Gets the (N, 4) CenterX, CenterY, Width, Height array.
+        """
+
+        return numpy.concatenate([self.centers, self.sizes], axis=1)
+
+    def xyxy(self) -> numpy.ndarray:
+        """
+        Gets the (N, 4) x1, y1, x2, y2 array.
+        """
+
+        half = self.sizes / 2
+        return numpy.concatenate([self.centers - half, self.centers + half], axis=1)
+
+    def corners(self) -> numpy.ndarray:
+        """
+        Gets the (N, 4) int32 array of x, y, w, h boxes, rounded the same way the drawing helpers do.
+        """
+
+        centers = self.centers.astype(numpy.float64)
+        sizes = self.sizes.astype(numpy.float64)
+
+        return numpy.concatenate([centers - sizes / 2, sizes], axis=1).astype(numpy.int32)
+
+    def scaled(self, factor: float) -> "Detections":
+        """
+        Gets a copy of the detections with the positions and sizes multiplied by factor.
+        """
+
+        factor = numpy.float32(factor)
+        return Detections(self.centers * factor, self.sizes * factor, self.class_ids, self.confidences)
+
+    def translated(self, dx: float, dy: float) -> "Detections":
+        """
+        Gets a copy of the detections moved by dx, dy.
+        """
+
+        return Detections(
+            self.centers + numpy.array([dx, dy], dtype=numpy.float32),
+            self.sizes, self.class_ids, self.confidences
+        )
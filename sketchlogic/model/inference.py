@@ -1,6 +1,12 @@
 from pathlib import Path
-from ultralytics.models import YOLO
+from typing import TYPE_CHECKING
+from sketchlogic.model.detections import Detections
+from sketchlogic.circuit import Gate, Pin, ObjectType
 import numpy
+import cv2
+
+if TYPE_CHECKING:
+    from ultralytics.models import YOLO
 
 
 def run(image: numpy.ndarray, model_path: Path) -> tuple[list, int]:
@@ -12,56 +18,153 @@ def run(image: numpy.ndarray, model_path: Path) -> tuple[list, int]:
         model_path (Path): The path to the model file
 
     Returns:
-        tuple[list, int]: A tuple containing a list of dictionaries containing the inference results and the next ID
+        tuple[list, int]: A tuple containing the gates, see to_results(), and the next ID
+    """
+
+    return predict(image, load(model_path))
+
+
+def load(model_path: Path) -> "YOLO":
+    """
+    Loads the model once so that it can be reused for many predictions.
+
+    Args:
+        model_path (Path): The path to the model file
+
+    Returns:
+        YOLO: The loaded model
+
+    Raises:
+        FileNotFoundError: If the model file does not exist.
     """
 
     if not model_path.exists():
         raise FileNotFoundError(f"Model not found: {model_path}")
 
-    model = YOLO(model_path)
-    results = model.predict(image, iou=0.5, agnostic_nms=True)[0]
+    # imported here so that other backends do not need ultralytics (and torch) installed
+    from ultralytics.models import YOLO
+
+    return YOLO(model_path)
+
+
+def predict(image: numpy.ndarray, model: "YOLO") -> tuple[list, int]:
+    """
+    Does inference on a single image with an already loaded model.
+
+    Args:
+        image (numpy.ndarray): The image to run inference on
+        model (YOLO): The loaded model, see load()
+
+    Returns:
+        tuple[list, int]: A tuple containing the gates, see to_results(), and the next ID
+    """
+
+    return to_results(detect(image, model))
+
 
-    if not results.boxes:
-        return [], 1
+def predict_batch(images: list[numpy.ndarray], model: "YOLO", max_batch_size: int = 8) -> list[tuple[list, int]]:
+    """
+    Does inference on many images, see detect_batch(). Every image gets its own ID sequence.
+
+    Returns:
+        list[tuple[list, int]]: The inference results and the next ID of every image, in order.
+    """
+
+    return [to_results(detections) for detections in detect_batch(images, model, max_batch_size)]
+
+
+def detect(image: numpy.ndarray, model: "YOLO", imgsz: int | None = None) -> Detections:
+    """
+    Runs the model on a single image and returns the columnar detections.
 
+    Args:
+        image (numpy.ndarray): The image to run inference on
+        model (YOLO): The loaded model, see load()
+        imgsz (int | None): The model input size to letterbox to. Defaults to the training size.
+
+    Returns:
+        Detections: The detected boxes in image pixels.
+    """
+
+    return detect_batch([image], model, imgsz=imgsz)[0]
+
+
+def detect_batch(
+    images: list[numpy.ndarray], model: "YOLO", max_batch_size: int = 8, imgsz: int | None = None
+) -> list[Detections]:
+    """
+    Runs the model on many images, passing up to max_batch_size of them to each forward pass.
+    ultralytics letterboxes images of different shapes to a common input size before stacking them.
+
+    Args:
+        images (list[numpy.ndarray]): The images to run inference on
+        model (YOLO): The loaded model, see load()
+        max_batch_size (int): The maximum number of images per forward pass.
+        imgsz (int | None): The model input size to letterbox to. Defaults to the training size.
+
+    Returns:
+        list[Detections]: The detections of every image, in order.
+    """
+
+    max_batch_size = max(1, max_batch_size)
+    size_args = {} if imgsz is None else {"imgsz": imgsz}
     output = []
-    next_id = 1
-
-    for i in range(len(results.boxes.cls)):
-        x, y, w, h = results.boxes.xywh[i].tolist()
-        class_id = int(results.boxes.cls[i])
-
-        class_name = class_to_name(class_id)
-        rotation = class_to_rotation(class_id)
-
-        gate = {
-            "$id": str(next_id),
-            "$type": class_name,
-            "CenterX": float(x),
-            "CenterY": float(y),
-            "Width": float(w),
-            "Height": float(h),
-            "Rotation": rotation
-        }
+
+    for start in range(0, len(images), max_batch_size):
+        # ultralytics letterboxes color images only, so grayscale ones are expanded at full size
+        batch = [
+            cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if len(image.shape) == 2 else image
+            for image in images[start:start + max_batch_size]
+        ]
+        for results in model.predict(batch, iou=0.5, agnostic_nms=True, **size_args):
+            if not results.boxes:
+                output.append(Detections.empty())
+                continue
+
+            output.append(Detections.from_xywh(
+                results.boxes.xywh.cpu().numpy(),
+                results.boxes.cls.cpu().numpy(),
+                results.boxes.conf.cpu().numpy(),
+            ))
+
+    return output
+
+
+def to_results(detections: Detections, next_id: int = 1) -> tuple[list[Gate], int]:
+    """
+    Converts the detections into the gate records used by the rest of the pipeline.
+
+    Args:
+        detections (Detections): The detections to convert
+        next_id (int): The first ID to give out
+
+    Returns:
+        tuple[list[Gate], int]: A tuple containing the gates, see circuit.Gate, and the next ID
+    """
+
+    output = []
+
+    # one bulk conversion to python values instead of one per box and field
+    centers = detections.centers.tolist()
+    sizes = detections.sizes.tolist()
+    class_ids = detections.class_ids.tolist()
+
+    for (x, y), (w, h), class_id in zip(centers, sizes, class_ids):
+        gate_type = ObjectType(class_to_name(class_id))
+        gate_id = next_id
         next_id += 1
 
-        if class_name == "NotGate":
-            gate["Input"] = {
-                "$id": str(next_id),
-                "Type": "Input"
-            }
+        inputs = []
+        if gate_type is ObjectType.NOT_GATE:
+            inputs.append(Pin(next_id))
             next_id += 1
-        else:
-            gate["Inputs"] = []
 
-        gate["Output"] = {
-            "$id": str(next_id),
-            "Type": "Output"
-        }
+        output.append(Gate(
+            gate_id, gate_type, float(x), float(y), float(w), float(h), class_to_rotation(class_id),
+            inputs, Pin(next_id)
+        ))
         next_id += 1
 
-        output.append(gate)
-
     return output, next_id
 
 
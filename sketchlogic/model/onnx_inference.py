@@ -0,0 +1,240 @@
+"""
+Inference backend running the exported ONNX model through onnxruntime on the CPU.
+
+This does not need ultralytics or torch at runtime. Pre-processing (letterboxing), output
+decoding and non-maximum suppression are done here with numpy and OpenCV, following what
+ultralytics does for `model.predict(image, iou=0.5, agnostic_nms=True)`.
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+from sketchlogic.model.detections import Detections
+import sketchlogic.model.inference as inference
+import sketchlogic.model.boxes as boxes_utils
+import numpy
+import cv2
+
+if TYPE_CHECKING:
+    import onnxruntime
+
+
+CONF_THRESHOLD = 0.25
+IOU_THRESHOLD = 0.5
+DEFAULT_IMGSZ = 1024
+PAD_COLOR = (114, 114, 114)
+
+
+def load(model_path: Path) -> "onnxruntime.InferenceSession":
+    """
+    Loads the ONNX model into a CPU inference session.
+
+    Args:
+        model_path (Path): The path to the .onnx model file
+
+    Returns:
+        onnxruntime.InferenceSession: The loaded session
+
+    Raises:
+        FileNotFoundError: If the model file does not exist.
+    """
+
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model not found: {model_path}")
+
+    import onnxruntime
+
+    return onnxruntime.InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+
+
+def predict(image: numpy.ndarray, session: "onnxruntime.InferenceSession") -> tuple[list, int]:
+    """
+    Does inference on a single image with an already loaded session.
+
+    Args:
+        image (numpy.ndarray): The BGR image to run inference on
+        session (onnxruntime.InferenceSession): The loaded session, see load()
+
+    Returns:
+        tuple[list, int]: A tuple containing the gates, see inference.to_results(), and the next ID
+    """
+
+    return inference.to_results(detect(image, session))
+
+
+def predict_batch(
+    images: list[numpy.ndarray], session: "onnxruntime.InferenceSession", max_batch_size: int = 8
+) -> list[tuple[list, int]]:
+    """
+    Does inference on many images, see detect_batch(). Every image gets its own ID sequence.
+
+    Returns:
+        list[tuple[list, int]]: The inference results and the next ID of every image, in order.
+    """
+
+    return [inference.to_results(detections) for detections in detect_batch(images, session, max_batch_size)]
+
+
+def detect(image: numpy.ndarray, session: "onnxruntime.InferenceSession", imgsz: int | None = None) -> Detections:
+    """
+    Runs the model on a single image and returns the columnar detections.
+
+    Args:
+        image (numpy.ndarray): The BGR image to run inference on
+        session (onnxruntime.InferenceSession): The loaded session, see load()
+        imgsz (int | None): The model input size to letterbox to, see input_size().
+
+    Returns:
+        Detections: The detected boxes in image pixels.
+    """
+
+    return detect_batch([image], session, imgsz=imgsz)[0]
+
+
+def detect_batch(
+    images: list[numpy.ndarray],
+    session: "onnxruntime.InferenceSession",
+    max_batch_size: int = 8,
+    imgsz: int | None = None,
+) -> list[Detections]:
+    """
+    Runs the model on many images, stacking up to max_batch_size of them into each forward pass.
+    All images are letterboxed to the same model input size so that they can be stacked.
+
+    Args:
+        images (list[numpy.ndarray]): The BGR images to run inference on
+        session (onnxruntime.InferenceSession): The loaded session, see load()
+        max_batch_size (int): The maximum number of images per forward pass. Models exported
+            without a dynamic batch size are limited to their fixed batch size.
+        imgsz (int | None): The model input size to letterbox to, see input_size().
+
+    Returns:
+        list[Detections]: The detections of every image, in order.
+    """
+
+    model_input = session.get_inputs()[0]
+    input_h, input_w = input_size(session, imgsz)
+
+    if isinstance(model_input.shape[0], int):
+        max_batch_size = min(max_batch_size, model_input.shape[0])
+    max_batch_size = max(1, max_batch_size)
+
+    output = []
+
+    for start in range(0, len(images), max_batch_size):
+        letterboxed = [letterbox(image, (input_h, input_w)) for image in images[start:start + max_batch_size]]
+        blob = numpy.stack([image_blob for image_blob, _, _ in letterboxed])
+
+        predictions = session.run(None, {model_input.name: blob})[0]
+
+        for prediction, (_, ratio, pad) in zip(predictions, letterboxed):
+            boxes, class_ids, confidences = decode(prediction, CONF_THRESHOLD, IOU_THRESHOLD)
+
+            boxes[:, 0] = (boxes[:, 0] - pad[0]) / ratio
+            boxes[:, 1] = (boxes[:, 1] - pad[1]) / ratio
+            boxes[:, 2:4] = boxes[:, 2:4] / ratio
+
+            output.append(Detections.from_xywh(boxes, class_ids, confidences))
+
+    return output
+
+
+def input_size(session: "onnxruntime.InferenceSession", imgsz: int | None = None) -> tuple[int, int]:
+    """
+    Gets the (height, width) to letterbox the images to.
+
+    Args:
+        session (onnxruntime.InferenceSession): The loaded session.
+        imgsz (int | None): The requested size. Models exported with a dynamic input size accept any
+            multiple of 32, and default to the training size.
+
+    Raises:
+        ValueError: If a size is requested that a model with a fixed input size does not accept.
+    """
+
+    shape = session.get_inputs()[0].shape
+    default = imgsz if imgsz is not None else DEFAULT_IMGSZ
+
+    height = shape[2] if isinstance(shape[2], int) else default
+    width = shape[3] if isinstance(shape[3], int) else default
+
+    if imgsz is not None and (height, width) != (imgsz, imgsz):
+        raise ValueError(
+            f"model.onnx_inference.input_size(): the model only accepts {height}x{width} inputs, "
+            f"export it with dynamic=True to run it at {imgsz}."
+        )
+
+    return height, width
+
+
+def letterbox(
+    image: numpy.ndarray, size: tuple[int, int]
+) -> tuple[numpy.ndarray, float, tuple[int, int]]:
+    """
+    Resizes the image into the model input size keeping its aspect ratio, pads the rest and
+    converts it into a normalized CHW float blob.
+
+    Args:
+        image (numpy.ndarray): The BGR (or grayscale) image.
+        size (tuple[int, int]): The (height, width) of the model input.
+
+    Returns:
+        tuple[numpy.ndarray, float, tuple[int, int]]: The (3, H, W) float32 RGB blob, the resize ratio,
+            and the (x, y) padding added on the left and top.
+    """
+
+    height, width = image.shape[:2]
+    target_h, target_w = size
+
+    ratio = min(target_h / height, target_w / width)
+    new_w, new_h = int(round(width * ratio)), int(round(height * ratio))
+
+    pad_x = (target_w - new_w) / 2
+    pad_y = (target_h - new_h) / 2
+
+    if (new_w, new_h) != (width, height):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=PAD_COLOR)
+
+    # grayscale images are only expanded to three channels here, at the model input size
+    if len(image.shape) == 2:
+        blob = numpy.repeat(image[numpy.newaxis], 3, axis=0)
+    else:
+        blob = cv2.cvtColor(image, cv2.COLOR_BGR2RGB).transpose(2, 0, 1)
+    blob = numpy.ascontiguousarray(blob, dtype=numpy.float32) / 255.0
+
+    return blob, ratio, (left, top)
+
+
+def decode(
+    output: numpy.ndarray, conf_threshold: float, iou_threshold: float
+) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """
+    Decodes a single YOLOv8 output tensor into boxes, applying class agnostic NMS.
+
+    Args:
+        output (numpy.ndarray): The (4 + num_classes, num_anchors) output for one image.
+        conf_threshold (float): The minimum confidence to keep a box.
+        iou_threshold (float): The IoU threshold for NMS.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]: The (N, 4) CenterX, CenterY, Width, Height boxes
+            in model input pixels, the (N,) class IDs and the (N,) confidences.
+    """
+
+    predictions = output.T
+    scores = predictions[:, 4:]
+
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[numpy.arange(len(scores)), class_ids]
+
+    keep = confidences > conf_threshold
+    boxes = predictions[keep, :4].astype(numpy.float32)
+    class_ids = class_ids[keep]
+    confidences = confidences[keep]
+
+    kept = boxes_utils.nms(boxes_utils.xywh_to_xyxy(boxes), confidences, iou_threshold)
+
+    return boxes[kept], class_ids[kept].astype(numpy.int64), confidences[kept]
@@ -0,0 +1,141 @@
+"""
+Tiled detection for high resolution scans and photos.
+
+Instead of shrinking the whole page into one model input (which loses small gates), the enhanced
+image is cut into overlapping tiles at full resolution. Tiles without any ink are skipped, so the
+cost scales with the drawn area rather than the paper area. Boxes are merged across tile seams with NMS.
+"""
+
+from sketchlogic.model.detections import Detections
+import sketchlogic.model.boxes as boxes_utils
+import numpy
+import cv2
+
+
+def detect(
+    image: numpy.ndarray,
+    model,
+    tile_size: int = 1024,
+    overlap: int = 256,
+    min_ink_pixels: int = 20,
+    max_batch_size: int = 8,
+    iou: float = 0.5,
+) -> Detections:
+    """
+    Runs the model on the inked tiles of the image and merges the detections.
+
+    Args:
+        image (numpy.ndarray): The enhanced image (black ink on white paper), grayscale or BGR.
+        model (Detector): A model returned by model.controller.load().
+        tile_size (int): The side of a square tile in pixels. Best kept at the model input size.
+        overlap (int): The overlap between neighbouring tiles in pixels. Should be larger than a gate.
+        min_ink_pixels (int): Tiles with fewer dark pixels than this are treated as empty and skipped.
+        max_batch_size (int): The maximum number of tiles per forward pass.
+        iou (float): The overlap threshold for merging boxes across tiles.
+
+    Returns:
+        Detections: The merged detections in image pixels.
+
+    Raises:
+        ValueError: If the overlap does not fit in the tile size.
+    """
+
+    if not 0 <= overlap < tile_size:
+        raise ValueError(f"model.tiling.detect(): overlap {overlap} must be in [0, {tile_size}).")
+
+    gray = image if len(image.shape) == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    height, width = gray.shape
+
+    tiles = _inked_tiles(gray, tile_size, overlap, min_ink_pixels)
+
+    if not tiles:
+        return Detections.empty()
+
+    # views into the image, the backends convert them to color at their input size
+    crops = [gray[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+    detections = model.detect_batch(crops, max_batch_size)
+
+    placed = [
+        tile_detections.translated(x1, y1)
+        for (x1, y1, _, _), tile_detections in zip(tiles, detections)
+    ]
+    cut = numpy.concatenate([
+        _cut_by_seam(tile_detections, tile, width, height)
+        for tile, tile_detections in zip(tiles, placed)
+    ])
+    merged = Detections.concatenate(placed)
+
+    # boxes cut by a seam are only kept if no tile saw the whole gate
+    priority = merged.confidences - cut.astype(numpy.float32)
+    kept = boxes_utils.nms(merged.xyxy(), priority, iou, by_smaller=True)
+
+    return merged[kept]
+
+
+def grid(width: int, height: int, tile_size: int, overlap: int) -> list[tuple[int, int, int, int]]:
+    """
+    Lays overlapping tiles over the image. The last tile of each row and column is aligned with
+    the image border, so every tile is a full tile_size square unless the image itself is smaller.
+
+    Returns:
+        list[tuple[int, int, int, int]]: The tiles as x1, y1, x2, y2.
+    """
+
+    xs = _starts(width, tile_size, tile_size - overlap)
+    ys = _starts(height, tile_size, tile_size - overlap)
+
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in ys for x in xs
+    ]
+
+
+def _starts(length: int, tile_size: int, stride: int) -> list[int]:
+    """
+    Gets the start offsets of the tiles along one axis.
+    """
+
+    if length <= tile_size:
+        return [0]
+
+    starts = list(range(0, length - tile_size, stride))
+    starts.append(length - tile_size)
+
+    return starts
+
+
+def _inked_tiles(
+    gray: numpy.ndarray, tile_size: int, overlap: int, min_ink_pixels: int
+) -> list[tuple[int, int, int, int]]:
+    """
+    Gets the tiles that contain at least min_ink_pixels dark pixels. An integral image of the
+    ink mask is built once, so checking a tile costs four lookups.
+    """
+
+    height, width = gray.shape
+    integral = cv2.integral((gray < 128).view(numpy.uint8))
+
+    return [
+        (x1, y1, x2, y2)
+        for x1, y1, x2, y2 in grid(width, height, tile_size, overlap)
+        if integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1] >= min_ink_pixels
+    ]
+
+
+def _cut_by_seam(
+    detections: Detections, tile: tuple[int, int, int, int], width: int, height: int, margin: float = 2.0
+) -> numpy.ndarray:
+    """
+    Flags the boxes touching an edge of the tile that is inside the image, i.e. boxes that
+    may have been cut in half by the tile border.
+    """
+
+    x1, y1, x2, y2 = tile
+    corners = detections.xyxy()
+
+    return (
+        ((corners[:, 0] <= x1 + margin) & (x1 > 0)) |
+        ((corners[:, 1] <= y1 + margin) & (y1 > 0)) |
+        ((corners[:, 2] >= x2 - margin) & (x2 < width)) |
+        ((corners[:, 3] >= y2 - margin) & (y2 < height))
+    )
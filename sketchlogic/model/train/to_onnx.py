@@ -1,15 +1,231 @@
-from ultralytics.models import YOLO
-import sys
+"""
+Exports the model to ONNX, optionally with a static INT8 quantized copy for faster CPU inference.
+
+Usage:
+    python -m sketchlogic.model.train.to_onnx <model_path> [--int8 <calibration_dir>]
+
+The INT8 model is calibrated on sketches that went through processing.image.enhance(), the same
+input the pipeline gives the model. A report comparing the size, CPU latency and detections of
+both models is printed at the end.
+"""
+
 from pathlib import Path
+import sketchlogic.processing.image as image_processing
+import sketchlogic.model.onnx_inference as onnx_inference
+from sketchlogic.model.detections import Detections
+import argparse
+import numpy
+import time
+import cv2
+
+
+IMAGE_SUFFIXES = [".png", ".jpg", ".jpeg", ".bmp"]
 
 
 def main():
-    if (len(sys.argv) != 2 or not Path(sys.argv[1]).exists()):
-        print("Usage: python to_onnx.py <model_path>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        prog="to_onnx",
+        description="Export the model to ONNX and optionally quantize it to INT8.",
+    )
+    parser.add_argument("model_path", type=Path, help="path to the .pt model (or an already exported .onnx)")
+    parser.add_argument("--int8", type=Path, metavar="CALIBRATION_DIR", help="folder of sketches to calibrate on")
+    parser.add_argument("--calibration-size", type=int, default=100, help="maximum number of calibration images")
+    parser.add_argument("--quantize-head", action="store_true", help="also quantize the detection head")
+    args = parser.parse_args()
+
+    if not args.model_path.exists():
+        parser.error(f"path does not exist: {args.model_path}")
+
+    fp32_path = export(args.model_path)
+    print(f"FP32 model: {fp32_path}")
+
+    if args.int8 is None:
+        return
+
+    images = load_calibration_images(args.int8, args.calibration_size)
+    int8_path = fp32_path.with_name(f"{fp32_path.stem}.int8.onnx")
+
+    quantize(fp32_path, int8_path, images, quantize_head=args.quantize_head)
+    print(f"INT8 model: {int8_path}")
+
+    report(fp32_path, int8_path, images)
+
+
+def export(model_path: Path) -> Path:
+    """
+    Exports a .pt model to ONNX with a dynamic batch size. ONNX models are returned as they are.
+
+    Returns:
+        Path: The path to the FP32 ONNX model.
+    """
+
+    if model_path.suffix == ".onnx":
+        return model_path
+
+    from ultralytics.models import YOLO
+
+    model = YOLO(model_path)
+    return Path(model.export(format="onnx", dynamic=True))     # dynamic batch size for batched inference
+
+
+def load_calibration_images(calibration_dir: Path, limit: int) -> list[numpy.ndarray]:
+    """
+    Loads and enhances the calibration sketches so they match what the model sees in the pipeline.
+
+    Raises:
+        FileNotFoundError: If the folder has no images.
+    """
+
+    paths = sorted(path for path in calibration_dir.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)[:limit]
+    if not paths:
+        raise FileNotFoundError(f"model.train.to_onnx: no images found in {calibration_dir}.")
+
+    return [
+        cv2.cvtColor(image_processing.enhance(image_processing.load(path)), cv2.COLOR_GRAY2BGR)
+        for path in paths
+    ]
+
+
+def quantize(fp32_path: Path, int8_path: Path, images: list[numpy.ndarray], quantize_head: bool = False) -> None:
+    """
+    Statically quantizes the model to INT8 (QDQ format, per channel weights) calibrated on the given images.
+
+    Args:
+        fp32_path (Path): The FP32 ONNX model.
+        int8_path (Path): Where to write the INT8 model.
+        images (list[numpy.ndarray]): The enhanced BGR calibration images.
+        quantize_head (bool): Whether to quantize the detection head too. It is left in FP32 by default
+            because the box regression loses most of the accuracy when quantized.
+    """
+
+    from onnxruntime.quantization import (
+        CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType, quantize_static
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+    import onnx
+
+    session = onnx_inference.load(fp32_path)
+    input_name = session.get_inputs()[0].name
+    input_size = onnx_inference.input_size(session)
+
+    class _Reader(CalibrationDataReader):
+        def __init__(self) -> None:
+            self.blobs = iter(onnx_inference.letterbox(image, input_size)[0][None] for image in images)
+
+        def get_next(self) -> dict | None:
+            blob = next(self.blobs, None)
+            return None if blob is None else {input_name: blob}
+
+    prepared_path = int8_path.with_name(f"{fp32_path.stem}.prepared.onnx")
+    quant_pre_process(str(fp32_path), str(prepared_path), skip_symbolic_shape=True)
+
+    nodes_to_exclude = []
+    if not quantize_head:
+        graph = onnx.load(str(prepared_path)).graph
+        head = _detection_head_prefix(graph)
+        if head is not None:
+            nodes_to_exclude = [node.name for node in graph.node if node.name.startswith(head)]
+
+    quantize_static(
+        str(prepared_path), str(int8_path), _Reader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        calibrate_method=CalibrationMethod.MinMax,
+        nodes_to_exclude=nodes_to_exclude,
+    )
+
+    prepared_path.unlink(missing_ok=True)
+
+
+def _detection_head_prefix(graph) -> str | None:
+    """
+    Gets the name prefix of the last ultralytics module (the Detect head), e.g. "/model.22/".
+    """
+
+    prefixes = [node.name.split("/")[1] for node in graph.node if node.name.startswith("/model.")]
+    if not prefixes:
+        return None
+
+    last = max(prefixes, key=lambda prefix: int(prefix.split(".")[1]))
+    return f"/{last}/"
+
+
+def report(fp32_path: Path, int8_path: Path, images: list[numpy.ndarray], runs: int = 10) -> None:
+    """
+    Prints the size, CPU latency and detection agreement of the INT8 model against the FP32 model.
+    Agreement is the share of boxes with a same class box of IoU >= 0.5 in the other model's output.
+    """
+
+    fp32 = onnx_inference.load(fp32_path)
+    int8 = onnx_inference.load(int8_path)
+
+    fp32_latency = _latency(fp32, images, runs)
+    int8_latency = _latency(int8, images, runs)
+
+    matched, total = 0, 0
+    for image in images:
+        fp32_detections = onnx_inference.detect(image, fp32)
+        int8_detections = onnx_inference.detect(image, int8)
+
+        matched += 2 * _count_matches(fp32_detections, int8_detections)
+        total += len(fp32_detections) + len(int8_detections)
+
+    fp32_size = fp32_path.stat().st_size / 2**20
+    int8_size = int8_path.stat().st_size / 2**20
+
+    print()
+    print(f"sketchlogic.model.train.to_onnx:")
+    print(f"Size: {fp32_size:.2f} MB -> {int8_size:.2f} MB ({fp32_size / int8_size:.2f}x smaller)")
+    print(f"Latency: {fp32_latency:.1f} ms -> {int8_latency:.1f} ms ({fp32_latency / int8_latency:.2f}x faster)")
+    print(f"Detection agreement: {matched / total * 100 if total else 100.0:.1f}% over {len(images)} images")
+
+
+def _latency(session, images: list[numpy.ndarray], runs: int) -> float:
+    """
+    Gets the mean latency in milliseconds of detect() over the images, after one warm-up run.
+    """
+
+    onnx_inference.detect(images[0], session)
+
+    start = time.perf_counter()
+    for index in range(runs):
+        onnx_inference.detect(images[index % len(images)], session)
+
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def _count_matches(a: Detections, b: Detections) -> int:
+    """
+    Greedily matches boxes of the same class with IoU >= 0.5 and returns the number of matched pairs.
+    """
+
+    if len(a) == 0 or len(b) == 0:
+        return 0
+
+    corners_a = a.xyxy()[:, None]
+    corners_b = b.xyxy()[None]
+
+    inter_w = numpy.clip(
+        numpy.minimum(corners_a[..., 2], corners_b[..., 2]) - numpy.maximum(corners_a[..., 0], corners_b[..., 0]), 0, None
+    )
+    inter_h = numpy.clip(
+        numpy.minimum(corners_a[..., 3], corners_b[..., 3]) - numpy.maximum(corners_a[..., 1], corners_b[..., 1]), 0, None
+    )
+    inter = inter_w * inter_h
+    union = a.sizes.prod(axis=1)[:, None] + b.sizes.prod(axis=1)[None] - inter
+
+    iou = numpy.where(a.class_ids[:, None] == b.class_ids[None], inter / (union + 1e-9), 0)
+
+    matches = 0
+    while iou.size and iou.max() >= 0.5:
+        i, j = numpy.unravel_index(iou.argmax(), iou.shape)
+        iou[i, :] = 0
+        iou[:, j] = 0
+        matches += 1
 
-    model = YOLO(sys.argv[1])
-    model.export(format="onnx")
+    return matches
 
 
 if __name__ == "__main__":
@@ -0,0 +1,124 @@
+"""
+Writes the circuit objects of the pipeline to a file or a stream.
+
+The compact format has no indentation or spaces and is written object by object in chunks, so the
+whole document is never held as one string. It is encoded with orjson when that is installed, and
+with the standard json module otherwise, giving the same bytes. The pretty format is the indented
+JSON of earlier versions, for reading the output while debugging. Either can be gzip compressed.
+"""
+
+from pathlib import Path
+from typing import BinaryIO, Iterator
+import contextlib
+import gzip
+import io
+import json
+
+
+FORMATS = ("compact", "pretty")
+
+# the size the compact writer buffers up to before writing to the destination
+CHUNK_SIZE = 64 * 2**10
+
+
+def write(output: list[dict], destination: Path | BinaryIO, format: str = "compact", compress: bool = False) -> None:
+    """
+    Writes the circuit objects as a JSON list.
+
+    Args:
+        output (list[dict]): The circuit objects, see Pipeline.run().
+        destination (Path | BinaryIO): The file to write to, or a binary stream such as an open file or
+            socket.makefile("wb"). A stream is flushed but left open.
+        format (str): "compact" or "pretty".
+        compress (bool): Whether to gzip the output.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+
+    _check_format(format, "write")
+
+    with open_destination(destination, compress) as stream:
+        dump(output, stream, format)
+
+
+@contextlib.contextmanager
+def open_destination(destination: Path | BinaryIO, compress: bool = False) -> Iterator[BinaryIO]:
+    """
+    Opens a file, or takes an open binary stream, to write to, through gzip if compressed. On exit a
+    file is closed and a stream is flushed but left open. Closing the gzip file writes its trailer
+    without closing what it writes to.
+
+    Args:
+        destination (Path | BinaryIO): The file to write to, or an open binary stream.
+        compress (bool): Whether to gzip what is written.
+    """
+
+    with contextlib.ExitStack() as stack:
+        if isinstance(destination, (str, Path)):
+            stream = stack.enter_context(open(destination, "wb"))
+        else:
+            stream = destination
+            stack.callback(stream.flush)
+
+        if compress:
+            stream = stack.enter_context(gzip.GzipFile(fileobj=stream, mode="wb"))
+
+        yield stream
+
+
+def dump(output: list[dict], stream: BinaryIO, format: str = "compact") -> None:
+    """
+    Encodes the circuit objects as a JSON list onto an open binary stream, see write().
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+
+    _check_format(format, "dump")
+
+    if format == "pretty":
+        text = io.TextIOWrapper(stream, encoding="utf-8")
+        json.dump(output, text, indent=4)
+        text.flush()
+
+        # leaves the stream open for the caller
+        text.detach()
+        return
+
+    dumps = _get_dumps()
+
+    chunk = bytearray(b"[")
+    for index, obj in enumerate(output):
+        if index:
+            chunk += b","
+        chunk += dumps(obj)
+
+        if len(chunk) >= CHUNK_SIZE:
+            stream.write(chunk)
+            chunk = bytearray()
+
+    chunk += b"]"
+    stream.write(chunk)
+
+
+def _check_format(format: str, function: str) -> None:
+    """
+    Raises a ValueError for an unknown format.
+    """
+
+    if format not in FORMATS:
+        raise ValueError(f"output.{function}(): unknown format {format!r}, expected one of {FORMATS}.")
+
+
+def _get_dumps():
+    """
+    Gets the compact encoder of a single object to bytes, orjson's if it is installed.
+    """
+
+    try:
+        import orjson
+    except ImportError:
+        return lambda obj: json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    return orjson.dumps
@@ -29,10 +29,86 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="enable debugging (outputs test files and prints logs)",
     )
+    parser.add_argument(
+        "--debug-dir",
+        type=Path,
+        default=Path("debug"),
+        help="directory the test files of every debug run are written to, in a subdirectory per run",
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="print how long the imported modules took to load",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["ultralytics", "onnx"],
+        default="ultralytics",
+        help="inference backend to run the model with",
+    )
+    parser.add_argument(
+        "--enhance",
+        choices=["nlmeans", "median"],
+        default="nlmeans",
+        help="denoising before binarization, median is much faster on large photos",
+    )
+    parser.add_argument(
+        "--skeleton",
+        choices=["skimage", "zhang_suen", "opencv"],
+        default="skimage",
+        help="thinning implementation, zhang_suen avoids importing skimage, opencv needs opencv-contrib-python",
+    )
+    parser.add_argument(
+        "--wires",
+        choices=["contours", "graph"],
+        default="contours",
+        help="wire extraction, graph traces the skeleton through its junctions and supports fan-out",
+    )
+    parser.add_argument(
+        "--orthogonal-wires",
+        action="store_true",
+        help="read horizontal and vertical wires straight off the image and only skeletonize the rest",
+    )
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        default=None,
+        help="detect large images in overlapping tiles of this size, skipping tiles without ink",
+    )
+    parser.add_argument(
+        "--cascade",
+        action="store_true",
+        help="run the model at a small input size first, escalating to full size only when unsure",
+    )
+    parser.add_argument(
+        "--max-side",
+        type=int,
+        default=None,
+        help="downscale images to at most this many pixels on the longest side, scaling every stage with it",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="reuse results of previously converted identical images from this directory",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=["compact", "pretty"],
+        default="compact",
+        help="compact writes the output without whitespace, pretty indents it for reading",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="gzip compress the output file",
+    )
     parser.add_argument(
         "--target",
-        default="iris",
-        help="target simulation software",
+        nargs="+",
+        choices=["iris", "logisim"],
+        default=["iris"],
+        help="target simulation software, several targets are each written next to the output file with their extension",
     )
 
     return parser.parse_args()
@@ -52,10 +128,12 @@ def _existing_path(path_str: str):
 
 def _file_path(path_str: str):
     """
-    Type function that ensures it has an existing file path.
+    Type function that ensures it has a file path in an existing folder. The file is created when it
+    is written, with several targets only the files next to it are, see controller.run().
     """
 
     path = Path(path_str)
-    path.touch(exist_ok=True)
+    if not path.parent.is_dir():
+        raise argparse.ArgumentTypeError(f"Folder does not exist: {path.parent}")
 
     return path
@@ -0,0 +1,292 @@
+from pathlib import Path
+import sketchlogic.model.controller
+import sketchlogic.connector.controller
+import sketchlogic.converter.controller
+import sketchlogic.processing.image as image_processing
+import sketchlogic.processing.preprocess as preprocess
+from sketchlogic.model.detections import Detections
+from sketchlogic.model.cascade import Cascade
+from sketchlogic.cache import ResultCache
+from sketchlogic.artifacts import ArtifactWriter, RunArtifacts
+from sketchlogic.registry import CircuitRegistry
+from sketchlogic.circuit import Circuit
+import numpy
+
+
+class Pipeline:
+    """
+    A reusable sketchlogic session. The model is loaded once on creation and every call
+    to run() reuses it, so converting many images does not pay the model setup each time.
+    """
+
+    def __init__(
+        self,
+        model_path: Path | None = None,
+        backend: str = "ultralytics",
+        enhance_mode: str = "nlmeans",
+        skeleton_method: str = "skimage",
+        wire_extraction: str = "contours",
+        orthogonal_wires: bool = False,
+        tile_size: int | None = None,
+        cascade: bool = False,
+        max_side: int | None = None,
+        cache_dir: Path | None = None,
+        cache_max_bytes: int = 256 * 2**20,
+        debug_dir: Path = Path("debug"),
+    ) -> None:
+        """
+        Args:
+            model_path (Path | None): The path to the model file. Defaults to the bundled model.
+            backend (str): The inference backend, "ultralytics" or "onnx".
+            enhance_mode (str): How images are denoised before binarizing, see processing.image.enhance().
+            skeleton_method (str): How the wires are thinned, see connector.image_handler.skeletonize().
+            wire_extraction (str): How the wires are read off the skeleton, see connector.controller.run().
+            orthogonal_wires (bool): Whether horizontal and vertical wires skip the skeleton, see
+                connector.orthogonal.detect().
+            tile_size (int | None): If given, images larger than this are detected tile by tile.
+            cascade (bool): Whether to run the model at a small input size first and only escalate to
+                the full size when needed. The escalation rate is kept in self.cascade.
+            max_side (int | None): If given, images are downscaled (at decode time where the codec allows)
+                so their longest side is at most this, and the pixel constants of every stage are scaled
+                to the resulting resolution. Returned detections are mapped back to the original image.
+            cache_dir (Path | None): If given, results are cached on disk in this directory and reused
+                for identical images. The directory can be shared between processes.
+            cache_max_bytes (int): The size limit of the cache directory.
+            debug_dir (Path): Where debug runs write their artifacts, one directory per run. They are
+                written in the background, see flush().
+        """
+
+        self.model = sketchlogic.model.controller.load(model_path, backend=backend)
+        self.enhance_mode = enhance_mode
+        self.skeleton_method = skeleton_method
+        self.wire_extraction = wire_extraction
+        self.orthogonal_wires = orthogonal_wires
+        self.tile_size = tile_size
+        self.cascade = Cascade() if cascade else None
+        self.max_side = max_side
+        self.cache = ResultCache(cache_dir, cache_max_bytes) if cache_dir is not None else None
+        self.artifacts = ArtifactWriter(debug_dir)
+
+        # everything that changes the output for the same image and model, see ResultCache.key()
+        self.params = {
+            "backend": backend, "enhance_mode": enhance_mode, "skeleton_method": skeleton_method,
+            "wire_extraction": wire_extraction, "orthogonal_wires": orthogonal_wires, "tile_size": tile_size, "cascade": cascade, "max_side": max_side,
+        }
+
+    def run(
+        self, image: numpy.ndarray | bytes, debug: bool = False, return_detections: bool = False,
+        target: str | None = "iris"
+    ) -> list | str | Circuit | tuple[list | str | Circuit, Detections]:
+        """
+        Converts a sketch into the output of a target, e.g. the list of circuit objects of the IRIS format.
+
+        Args:
+            image (numpy.ndarray | bytes): A BGR image, or the encoded bytes of one (png, jpg, etc.).
+            debug (bool): Whether to output test files and print logs. The cache is bypassed in debug mode.
+                The test files are written to a new directory in debug_dir.
+            return_detections (bool): Whether to also return the detections of the model, in pixels of
+                the original image.
+            target (str | None): The output format, one of converter.controller.EXPORTERS. None returns
+                the laid out circuit instead, which every target can be written from without running the
+                pipeline again, see converter.controller.write().
+
+        Returns:
+            list | str | Circuit | tuple[list | str | Circuit, Detections]: The output of the target, and
+                the detections if return_detections is set.
+
+        Raises:
+            ValueError: If the target is not supported.
+        """
+
+        # an unsupported target fails before the image is processed
+        if target is not None:
+            sketchlogic.converter.controller.get_exporter(target)
+
+        image, ratio = self._normalize(image)
+
+        key = None
+        if self.cache is not None and not debug:
+            key = ResultCache.key(image, self.model.model_hash, self.params)
+            cached = self.cache.get(key)
+
+            if cached is not None:
+                output = self._export(cached[0], target)
+                return (output, cached[1]) if return_detections else output
+
+        circuit, detections = self._convert(image, debug, self._start_run() if debug else None)
+
+        if ratio != 1.0:
+            detections = detections.scaled(1 / ratio)
+
+        if key is not None:
+            self.cache.put(key, circuit, detections)
+
+        output = self._export(circuit, target)
+        return (output, detections) if return_detections else output
+
+    def _normalize(self, image: numpy.ndarray | bytes) -> tuple[numpy.ndarray, float]:
+        """
+        Decodes the image if needed and brings it down to max_side.
+
+        Returns:
+            tuple[numpy.ndarray, float]: The working image and its size relative to the original image.
+        """
+
+        if isinstance(image, (bytes, bytearray, memoryview)):
+            data = bytes(image)
+            if self.max_side is None:
+                return image_processing.decode(data), 1.0
+
+            size = image_processing.image_size(data[:2**16])
+            if size is None:
+                # the size is only known after decoding, so decode in full and resize
+                image = image_processing.decode(data, grayscale=True)
+            else:
+                working = image_processing.decode(data, self.max_side, grayscale=True)
+                return working, max(working.shape[:2]) / max(size)
+
+        if self.max_side is None:
+            return image, 1.0
+
+        working = image_processing.fit(image, self.max_side)
+        return working, max(working.shape[:2]) / max(image.shape[:2])
+
+    def _scale(self, image: numpy.ndarray) -> float:
+        """
+        Gets the scale of the stage pixel constants for a normalized image. Without max_side the
+        constants are used as they are, whatever the resolution.
+        """
+
+        return preprocess.resolution_scale(image) if self.max_side is not None else 1.0
+
+    def flush(self) -> None:
+        """
+        Waits until the debug artifacts of all runs so far are written.
+        """
+
+        self.artifacts.flush()
+
+    def _start_run(self) -> RunArtifacts:
+        """
+        Starts the debug artifacts of a run.
+        """
+
+        artifacts = self.artifacts.start_run()
+
+        print()
+        print(f"sketchlogic.pipeline:")
+        print(f"Debug artifacts: {artifacts.directory}")
+
+        return artifacts
+
+    def _convert(
+        self, image: numpy.ndarray, debug: bool, artifacts: RunArtifacts | None = None
+    ) -> tuple[Circuit, Detections]:
+        """
+        Runs all the stages on a normalized image.
+        """
+
+        preprocessed = preprocess.run(image, self.enhance_mode, scale=self._scale(image), debug=debug)
+
+        if artifacts is not None:
+            artifacts.save("enhancer_test.png", lambda enhanced: enhanced, preprocessed.enhanced)
+
+        detections = sketchlogic.model.controller.run(
+            preprocessed.enhanced, self.model, tile_size=self.tile_size, cascade=self.cascade,
+            debug=debug, artifacts=artifacts
+        )
+
+        registry = CircuitRegistry()
+        model_results, wires, io_results, next_id = sketchlogic.connector.controller.run(
+            preprocessed, detections, self.skeleton_method, self.wire_extraction, self.orthogonal_wires,
+            debug=debug, artifacts=artifacts, registry=registry
+        )
+
+        circuit = sketchlogic.converter.controller.run(
+            model_results, wires, io_results, debug=debug, artifacts=artifacts, registry=registry
+        )
+        return circuit, detections
+
+    @staticmethod
+    def _export(circuit: Circuit, target: str | None) -> list | str | Circuit:
+        """
+        Converts a laid out circuit into the output of the target, or leaves it as is without one.
+        """
+
+        if target is None:
+            return circuit
+
+        return sketchlogic.converter.controller.export(circuit, target)
+
+    def run_batch(
+        self, images: list[numpy.ndarray | bytes], max_batch_size: int = 8, debug: bool = False,
+        target: str | None = "iris"
+    ) -> list[list | str | Circuit]:
+        """
+        Converts many sketches, running the model on up to max_batch_size of them per forward pass.
+        Images found in the cache are not run again.
+
+        Args:
+            images (list[numpy.ndarray | bytes]): BGR images, or the encoded bytes of them.
+            max_batch_size (int): The maximum number of images per forward pass.
+            debug (bool): Whether to output test files, in a directory per image, and print logs.
+            target (str | None): The output format, or None for the laid out circuits, see run().
+
+        Returns:
+            list[list | str | Circuit]: The output of every image, in order. Ids restart at 1 for every image.
+
+        Raises:
+            ValueError: If the target is not supported.
+        """
+
+        if target is not None:
+            sketchlogic.converter.controller.get_exporter(target)
+
+        images, ratios = zip(*[self._normalize(image) for image in images]) if images else ((), ())
+
+        output = [None] * len(images)
+        keys = [None] * len(images)
+
+        if self.cache is not None and not debug:
+            for index, image in enumerate(images):
+                keys[index] = ResultCache.key(image, self.model.model_hash, self.params)
+                cached = self.cache.get(keys[index])
+                if cached is not None:
+                    output[index] = self._export(cached[0], target)
+
+        pending = [index for index in range(len(images)) if output[index] is None]
+        preprocessed_images = [
+            preprocess.run(images[index], self.enhance_mode, scale=self._scale(images[index]))
+            for index in pending
+        ]
+
+        run_artifacts = [self._start_run() for _ in pending] if debug else None
+        for artifacts, preprocessed in zip(run_artifacts or [], preprocessed_images):
+            artifacts.save("enhancer_test.png", lambda enhanced: enhanced, preprocessed.enhanced)
+
+        batch_detections = sketchlogic.model.controller.run_batch(
+            [preprocessed.enhanced for preprocessed in preprocessed_images], self.model, max_batch_size=max_batch_size,
+            debug=debug, artifacts=run_artifacts
+        )
+
+        for index, preprocessed, detections, artifacts in zip(
+            pending, preprocessed_images, batch_detections, run_artifacts or [None] * len(pending)
+        ):
+            registry = CircuitRegistry()
+            model_results, wires, io_results, next_id = sketchlogic.connector.controller.run(
+                preprocessed, detections, self.skeleton_method, self.wire_extraction, self.orthogonal_wires,
+                debug=debug, artifacts=artifacts, registry=registry
+            )
+            circuit = sketchlogic.converter.controller.run(
+                model_results, wires, io_results, debug=debug, artifacts=artifacts, registry=registry
+            )
+
+            # cached in pixels of the original image, like run() does
+            if keys[index] is not None:
+                if ratios[index] != 1.0:
+                    detections = detections.scaled(1 / ratios[index])
+                self.cache.put(keys[index], circuit, detections)
+
+            output[index] = self._export(circuit, target)
+
+        return output
@@ -0,0 +1,121 @@
+"""
+Compares the enhance modes on the same sketches.
+
+Usage:
+    python -m sketchlogic.processing.benchmark <image_dir> [--backend onnx] [--model <model_path>]
+
+Every image is enhanced with each mode of processing.image.ENHANCE_MODES, then run through the
+model and the connector. The report shows the enhance time per mode and how many gates and wires
+were found downstream, so a faster mode can be checked against the default before switching.
+"""
+
+from pathlib import Path
+import sketchlogic.processing.image as image_processing
+import sketchlogic.processing.preprocess as preprocess
+import sketchlogic.model.controller
+import sketchlogic.connector.controller
+import argparse
+import numpy
+import time
+
+
+IMAGE_SUFFIXES = [".png", ".jpg", ".jpeg", ".bmp"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="benchmark",
+        description="Compare the speed and downstream results of the enhance modes.",
+    )
+    parser.add_argument("image_dir", type=Path, help="folder of sketches to benchmark on")
+    parser.add_argument("--backend", choices=["ultralytics", "onnx"], default="ultralytics", help="inference backend")
+    parser.add_argument("--model", type=Path, default=None, help="path to the model, defaults to the bundled one")
+    parser.add_argument("--runs", type=int, default=3, help="enhance runs per image, the fastest is kept")
+    args = parser.parse_args()
+
+    if not args.image_dir.is_dir():
+        parser.error(f"not a directory: {args.image_dir}")
+
+    paths = sorted(path for path in args.image_dir.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
+    if not paths:
+        parser.error(f"no images found in {args.image_dir}")
+
+    model = sketchlogic.model.controller.load(args.model, backend=args.backend)
+    images = [image_processing.load(path) for path in paths]
+
+    report(benchmark(images, model, args.runs), len(images))
+
+
+def benchmark(images: list[numpy.ndarray], model, runs: int = 3) -> dict[str, list[tuple[float, int, int]]]:
+    """
+    Runs every enhance mode on every image.
+
+    Args:
+        images (list[numpy.ndarray]): The BGR sketches.
+        model (Detector): A model returned by model.controller.load().
+        runs (int): How many times each image is enhanced, the fastest run is kept.
+
+    Returns:
+        dict[str, list[tuple[float, int, int]]]: Per mode, the enhance seconds, gate count and wire
+            count of every image.
+    """
+
+    results = {}
+
+    for mode in image_processing.ENHANCE_MODES:
+        results[mode] = []
+
+        for image in images:
+            seconds, preprocessed = _fastest(image, mode, runs)
+
+            detections = sketchlogic.model.controller.run(preprocessed.enhanced, model)
+            _, wires, _, _ = sketchlogic.connector.controller.run(preprocessed, detections)
+
+            results[mode].append((seconds, len(detections), len(wires)))
+
+    return results
+
+
+def report(results: dict[str, list[tuple[float, int, int]]], image_count: int) -> None:
+    """
+    Prints the enhance time and downstream counts of every mode next to the first (default) mode.
+    """
+
+    baseline_mode = image_processing.ENHANCE_MODES[0]
+    baseline = results[baseline_mode]
+    baseline_seconds = sum(seconds for seconds, _, _ in baseline)
+
+    print()
+    print(f"sketchlogic.processing.benchmark:")
+    print(f"{image_count} images, counts compared to {baseline_mode}")
+    print(f"{'mode':<10}{'enhance':>12}{'speedup':>10}{'gates':>8}{'wires':>8}{'same gates':>12}{'same wires':>12}")
+
+    for mode, rows in results.items():
+        seconds = sum(row[0] for row in rows)
+        gates = sum(row[1] for row in rows)
+        wires = sum(row[2] for row in rows)
+        same_gates = sum(row[1] == base[1] for row, base in zip(rows, baseline))
+        same_wires = sum(row[2] == base[2] for row, base in zip(rows, baseline))
+
+        print(
+            f"{mode:<10}{seconds / image_count * 1000:>9.1f} ms{baseline_seconds / seconds:>9.1f}x"
+            f"{gates:>8}{wires:>8}{same_gates:>8}/{image_count:<3}{same_wires:>8}/{image_count:<3}"
+        )
+
+
+def _fastest(image: numpy.ndarray, mode: str, runs: int) -> tuple[float, preprocess.Preprocessed]:
+    """
+    Preprocesses the image runs times and gets the fastest time with the preprocessed image.
+    """
+
+    best = float("inf")
+    for _ in range(max(runs, 1)):
+        start = time.perf_counter()
+        preprocessed = preprocess.run(image, mode)
+        best = min(best, time.perf_counter() - start)
+
+    return best, preprocessed
+
+
+if __name__ == "__main__":
+    main()
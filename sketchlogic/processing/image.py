@@ -3,12 +3,32 @@ import numpy
 from pathlib import Path
 
 
-def load(image_path: Path) -> numpy.ndarray:
+# the pixel constants of the stages are tuned for sketches of about this many pixels on the longest side
+REFERENCE_SIDE = 2000
+
+
+# imdecode flags per grayscale and reduction factor
+_READ_FLAGS = {
+    False: {
+        1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+        4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8
+    },
+    True: {
+        1: cv2.IMREAD_GRAYSCALE, 2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+        4: cv2.IMREAD_REDUCED_GRAYSCALE_4, 8: cv2.IMREAD_REDUCED_GRAYSCALE_8
+    },
+}
+
+
+def load(image_path: Path, max_side: int | None = None, grayscale: bool = False) -> numpy.ndarray:
     """
     Loads the image from the given path into a numpy array.
 
     Args:
         image_path (Path): The path to the image, must exist.
+        max_side (int | None): If given, the image is downscaled so its longest side is at most this,
+            decoding JPEGs straight to a reduced size. See decode().
+        grayscale (bool): Whether to decode into a single channel.
 
     Returns:
         numpy.ndarray: The loaded image as a numpy array.
@@ -20,11 +40,98 @@ def load(image_path: Path) -> numpy.ndarray:
     if not image_path.exists():
         raise FileNotFoundError(f"processing.image.load_image(): file not found {str(image_path)}.")
 
-    image = cv2.imread(str(image_path))
-    if image is None:
+    try:
+        return decode(numpy.fromfile(str(image_path), dtype=numpy.uint8), max_side, grayscale)
+    except ValueError:
         raise ValueError(f"processing.image.load_image(): failed to read image from {str(image_path)}.")
 
-    return image
+
+def decode(data: bytes | numpy.ndarray, max_side: int | None = None, grayscale: bool = False) -> numpy.ndarray:
+    """
+    Decodes an encoded image (png, jpg, etc.) from memory into a numpy array.
+
+    When max_side is given and the header tells the size up front, the codec is asked for a
+    1/2, 1/4 or 1/8 scale decode that is still at least max_side large (JPEG decodes those without
+    ever building the full image), and only the remainder is resized.
+
+    Args:
+        data (bytes | numpy.ndarray): The encoded image bytes.
+        max_side (int | None): If given, the longest side of the decoded image is at most this.
+        grayscale (bool): Whether to decode into a single channel.
+
+    Returns:
+        numpy.ndarray: The decoded image as a numpy array.
+
+    Raises:
+        ValueError: If the bytes could not be decoded into an image.
+    """
+
+    buffer = numpy.frombuffer(data, dtype=numpy.uint8)
+
+    # imdecode raises cv2.error on an empty buffer instead of returning None
+    if buffer.size == 0:
+        raise ValueError("processing.image.decode(): failed to decode image from empty bytes.")
+
+    reduction = 1
+    size = image_size(buffer[:2**16].tobytes()) if max_side is not None else None
+    if size is not None:
+        while reduction < 8 and max(size) // (reduction * 2) >= max_side:
+            reduction *= 2
+
+    image = cv2.imdecode(buffer, _READ_FLAGS[grayscale][reduction])
+    if image is None:
+        raise ValueError("processing.image.decode(): failed to decode image from bytes.")
+
+    return fit(image, max_side) if max_side is not None else image
+
+
+def fit(image: numpy.ndarray, max_side: int) -> numpy.ndarray:
+    """
+    Downscales the image so its longest side is at most max_side. Smaller images are returned as they are.
+    """
+
+    height, width = image.shape[:2]
+    ratio = max_side / max(height, width)
+    if ratio >= 1:
+        return image
+
+    size = (max(1, round(width * ratio)), max(1, round(height * ratio)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def image_size(header: bytes) -> tuple[int, int] | None:
+    """
+    Reads the width and height of a PNG or JPEG from the start of its bytes without decoding it.
+
+    Returns:
+        tuple[int, int] | None: The (width, height), or None if the format is not recognized.
+    """
+
+    if header[:8] == b"\x89PNG\r\n\x1a\n" and len(header) >= 24:
+        return int.from_bytes(header[16:20], "big"), int.from_bytes(header[20:24], "big")
+
+    if header[:2] != b"\xff\xd8":
+        return None
+
+    # walk the JPEG segments up to the start of frame, which holds the size
+    offset = 2
+    while offset + 9 <= len(header):
+        if header[offset] != 0xFF:
+            return None
+
+        marker = header[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height = int.from_bytes(header[offset + 5:offset + 7], "big")
+            width = int.from_bytes(header[offset + 7:offset + 9], "big")
+            return width, height
+
+        offset += 2 + int.from_bytes(header[offset + 2:offset + 4], "big")
+
+    return None
 
 
 def save(image: numpy.ndarray, save_path: Path) -> None:
@@ -84,27 +191,63 @@ def draw_component_boxes(
         cv2.putText(image, label, (x + 6, y + 20), cv2.FONT_HERSHEY_COMPLEX, 0.5, font_color, 2)
 
 
-def enhance(image: numpy.ndarray) -> numpy.ndarray:
+ENHANCE_MODES = ("nlmeans", "median")
+
+
+def enhance(image: numpy.ndarray, mode: str = "nlmeans", scale: float = 1.0) -> numpy.ndarray:
     """
     Enhances the image by removing shadows and noise.
 
     Args:
-        image (numpy.ndarray): The image to enhance.
+        image (numpy.ndarray): The BGR or grayscale image to enhance.
+        mode (str): How to denoise before binarizing, one of ENHANCE_MODES.
+            "nlmeans" uses non-local means, the slowest but most thorough.
+            "median" uses a 5x5 median filter, an order of magnitude faster on large photos. The blur
+            and threshold after the adaptive binarization remove most of the speckles it leaves.
+        scale (float): The image resolution relative to REFERENCE_SIDE. The filter sizes are scaled with it.
 
     Returns:
         numpy.ndarray: The enhanced image.
+
+    Raises:
+        ValueError: If the mode is unknown.
     """
 
-    grayscale_img = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    grayscale_img = cv2.fastNlMeansDenoising(grayscale_img, h=10)
-    thresh_img = cv2.adaptiveThreshold(
+    if mode not in ENHANCE_MODES:
+        raise ValueError(f"processing.image.enhance(): unknown mode {mode}, expected one of {ENHANCE_MODES}.")
+
+    if len(image.shape) == 2:
+        grayscale_img = image.copy()
+    else:
+        grayscale_img = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    if mode == "nlmeans":
+        grayscale_img = cv2.fastNlMeansDenoising(grayscale_img, h=10)
+    else:
+        cv2.medianBlur(grayscale_img, scaled_kernel(5, scale), dst=grayscale_img)
+
+    # the remaining steps all work in place on the one grayscale buffer
+    cv2.adaptiveThreshold(
         grayscale_img, 255,
         cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
         cv2.THRESH_BINARY,
-        blockSize=51, C=10
+        blockSize=scaled_kernel(51, scale), C=10,
+        dst=grayscale_img
     )
 
-    blurred = cv2.GaussianBlur(thresh_img, (11, 11), sigmaX=0)
-    _, final = cv2.threshold(blurred, 127, 255, cv2.THRESH_BINARY)
+    blur_size = scaled_kernel(11, scale)
+    cv2.GaussianBlur(grayscale_img, (blur_size, blur_size), sigmaX=0, dst=grayscale_img)
+    cv2.threshold(grayscale_img, 127, 255, cv2.THRESH_BINARY, dst=grayscale_img)
+
+    return grayscale_img
+
+
+def scaled_kernel(size: int, scale: float) -> int:
+    """
+    Scales an odd filter size, keeping it odd and at least 3.
+    """
+
+    if scale == 1.0:
+        return size
 
-    return final
+    return max(3, int(round((size - 1) / 2 * scale)) * 2 + 1)
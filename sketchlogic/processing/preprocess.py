@@ -0,0 +1,96 @@
+"""
+Single pass preprocessing shared by the model and the connector.
+
+The enhanced image is already binary (black ink on white paper), so the wire mask the connector
+needs is its inverse with small gaps closed. Both are derived here once per image instead of the
+connector thresholding the enhanced image again, and the model backends convert the grayscale
+image to color themselves, only at their input size.
+"""
+
+import sketchlogic.processing.image as image_processing
+import numpy
+import cv2
+
+
+class Preprocessed:
+    """
+    The derived images of one sketch.
+    """
+
+    def __init__(self, enhanced: numpy.ndarray, wires: numpy.ndarray, scale: float = 1.0) -> None:
+        """
+        Args:
+            enhanced (numpy.ndarray): The binary grayscale image, black ink on white paper. The model input.
+            wires (numpy.ndarray): The binary ink mask with small gaps bridged, white ink on black.
+                The input of the connector's skeletonization.
+            scale (float): The resolution of the images relative to image.REFERENCE_SIDE.
+        """
+
+        self.enhanced = enhanced
+        self.wires = wires
+        self.scale = scale
+
+    def pixels(self, value: int) -> int:
+        """
+        Scales a pixel constant tuned at the reference resolution to the resolution of these images.
+        """
+
+        return pixels(value, self.scale)
+
+
+def run(
+    image: numpy.ndarray,
+    mode: str = "nlmeans",
+    max_gap_size: int = 10,
+    scale: float = 1.0,
+    debug: bool = False,
+) -> Preprocessed:
+    """
+    Enhances the image and derives the wire mask from it.
+
+    Args:
+        image (numpy.ndarray): The BGR or grayscale image.
+        mode (str): The enhance mode, see processing.image.enhance().
+        max_gap_size (int): The largest gap in a line that is bridged in the wire mask, in reference pixels.
+        scale (float): The image resolution relative to image.REFERENCE_SIDE, see resolution_scale().
+            Every pixel constant of the stages is scaled with it.
+        debug (bool): Whether to print the ink coverage.
+
+    Returns:
+        Preprocessed: The enhanced image and the wire mask.
+    """
+
+    enhanced = image_processing.enhance(image, mode, scale)
+
+    # enhance() only leaves 0 and 255, inverting replaces the connector's darkest pixel threshold
+    wires = cv2.bitwise_not(enhanced)
+    gap = pixels(max_gap_size, scale)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (gap, gap))
+    cv2.morphologyEx(wires, cv2.MORPH_CLOSE, kernel, dst=wires)
+
+    if debug:
+        print()
+        print(f"sketchlogic.processing.preprocess:")
+        print(f"Ink coverage: {cv2.countNonZero(wires) / wires.size * 100:.2f}%")
+
+    return Preprocessed(enhanced, wires, scale)
+
+
+def resolution_scale(image: numpy.ndarray) -> float:
+    """
+    Gets the resolution of an image relative to image.REFERENCE_SIDE, the resolution the pixel
+    constants of the stages are tuned for.
+    """
+
+    return max(image.shape[:2]) / image_processing.REFERENCE_SIDE
+
+
+def pixels(value: int, scale: float) -> int:
+    """
+    Scales a pixel constant tuned at the reference resolution, keeping it at least 1.
+    """
+
+    if scale == 1.0:
+        return value
+
+    return max(1, int(round(value * scale)))
@@ -0,0 +1,138 @@
+"""
+Index of a circuit under construction, for constant time connectivity lookups.
+
+The circuit objects stay the records the stages pass around, see circuit. The registry keeps, next
+to them, every object by id, the owner of every pin and the wires attached to every pin. The stages
+attach wires through it, so the index never goes out of date.
+"""
+
+from sketchlogic.circuit import Gate, IO, Wire, ObjectType
+
+
+class CircuitRegistry:
+    """
+    The objects of a circuit by id, the owner of every pin and the wires attached to every pin.
+    """
+
+    def __init__(self, objects: list | None = None) -> None:
+        """
+        Args:
+            objects (list | None): Circuit objects to register right away, see add().
+        """
+
+        self.objects = {}
+        self.owners = {}
+        self.attached = {}
+
+        # the order wires were added in, which is their order in the wire list
+        self._order = {}
+
+        for obj in objects or []:
+            self.add(obj)
+
+    def add(self, obj: Gate | IO | Wire) -> None:
+        """
+        Registers a circuit object with its pins, or a wire with the pins it is attached to.
+        """
+
+        self.objects[obj.id] = obj
+
+        if obj.type is ObjectType.WIRE:
+            self._order.setdefault(obj.id, len(self._order))
+            for pin_id in (obj.main_input, obj.main_output):
+                if pin_id is not None:
+                    self.attached.setdefault(pin_id, {})[obj.id] = obj
+            return
+
+        for pin in obj.pins():
+            self.owners[pin.id] = obj
+
+    def add_pin(self, owner: Gate | IO, pin_id: int) -> None:
+        """
+        Registers a pin that was added to an object after the object was registered.
+        """
+
+        self.owners[pin_id] = owner
+
+    def attach(self, wire: Wire, end: str, pin_id: int) -> None:
+        """
+        Attaches an end of a wire to a pin.
+
+        Args:
+            wire (Wire): The registered wire.
+            end (str): "main_input" or "main_output".
+            pin_id (int): The id of the pin.
+        """
+
+        previous = getattr(wire, end)
+        if previous is not None:
+            self.attached.get(previous, {}).pop(wire.id, None)
+
+        setattr(wire, end, pin_id)
+        self.attached.setdefault(pin_id, {})[wire.id] = wire
+
+    def owner(self, pin_id: int) -> Gate | IO | None:
+        """
+        Gets the object that has the pin, if any.
+        """
+
+        return self.owners.get(pin_id)
+
+    def wire_at(self, pin_id: int) -> Wire | None:
+        """
+        Gets the first wire (in the order of the wire list) attached to the pin, if any.
+        """
+
+        wires = self.attached.get(pin_id)
+        if not wires:
+            return None
+
+        return wires[min(wires, key=self._order.__getitem__)]
+
+    def remove(self, obj: Gate | IO | Wire) -> None:
+        """
+        Unregisters an object. A wire is detached from its pins, the pins of anything else are dropped.
+        """
+
+        self.objects.pop(obj.id, None)
+
+        if obj.type is ObjectType.WIRE:
+            self._order.pop(obj.id, None)
+            for pin_id in (obj.main_input, obj.main_output):
+                if pin_id is not None:
+                    self.attached.get(pin_id, {}).pop(obj.id, None)
+            return
+
+        for pin in obj.pins():
+            self.owners.pop(pin.id, None)
+
+    def sweep(self, wires: list[Wire]) -> list[Wire]:
+        """
+        Removes the wires attached to nothing, from the registry and from the list in place.
+
+        Returns:
+            list[Wire]: The removed wires, in order.
+        """
+
+        removed = [wire for wire in wires if wire.main_input is None and wire.main_output is None]
+        if removed:
+            wires[:] = [wire for wire in wires if wire.main_input is not None or wire.main_output is not None]
+
+        for wire in removed:
+            self.remove(wire)
+
+        return removed
+
+    def discard(self, wires: list[Wire], removed: list[Wire]) -> None:
+        """
+        Removes the given wires from the registry and from the list in place.
+        """
+
+        if not removed:
+            return
+
+        removed_ids = {wire.id for wire in removed}
+        wires[:] = [wire for wire in wires if wire.id not in removed_ids]
+
+        for wire in removed:
+            self.remove(wire)
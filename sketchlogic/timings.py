@@ -0,0 +1,85 @@
+"""
+Import cost tracking for the --timings report.
+
+Heavy backends (skimage, ultralytics/torch, onnxruntime) are imported lazily by the stages that
+need them. track_imports() records how long every module takes to import from then on, so the
+report shows what the start-up actually paid for.
+"""
+
+from importlib.abc import MetaPathFinder
+import time
+import sys
+
+
+_records: list[tuple[str, float]] = []
+_stack: list[float] = []
+
+
+def track_imports() -> None:
+    """
+    Starts recording the import time of every module imported from now on.
+    """
+
+    if not any(isinstance(finder, _TimedFinder) for finder in sys.meta_path):
+        sys.meta_path.insert(0, _TimedFinder())
+
+
+def report(top: int = 15) -> None:
+    """
+    Prints the import cost per package (sketchlogic modules are listed on their own), most expensive first.
+
+    Args:
+        top (int): The maximum number of entries to print.
+    """
+
+    costs = {}
+    for module_name, self_time in _records:
+        key = module_name if module_name.startswith("sketchlogic") else module_name.split(".")[0]
+        costs[key] = costs.get(key, 0.0) + self_time
+
+    print()
+    print(f"sketchlogic.timings:")
+    print(f"Import time: {sum(costs.values()) * 1000:.1f} ms over {len(_records)} modules")
+
+    for key, cost in sorted(costs.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"{cost * 1000:>9.1f} ms  {key}")
+
+
+class _TimedFinder(MetaPathFinder):
+    """
+    Finds modules through the other finders and times the loading of whatever they find.
+    Times are recorded exclusive of the nested imports, like `python -X importtime`.
+    """
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        loader = spec.loader
+        # class level loaders (builtins, frozen) are shared by all their modules, leave them alone
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return spec
+
+        exec_module = loader.exec_module
+
+        def timed_exec_module(module):
+            _stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = _stack.pop()
+                _records.append((fullname, elapsed - nested))
+                if _stack:
+                    _stack[-1] += elapsed
+
+        loader.exec_module = timed_exec_module
+        return spec
@@ -0,0 +1,36 @@
+from sketchlogic.cache import ResultCache
+from sketchlogic.circuit import Circuit
+from sketchlogic.model.detections import Detections
+import sketchlogic.cache as cache
+import numpy
+
+
+def _size(cache_dir) -> int:
+    return sum(path.stat().st_size for path in cache_dir.glob("*/*.json"))
+
+
+def test_put_scans_only_when_the_cache_may_be_too_large(tmp_path, monkeypatch):
+    result_cache = ResultCache(tmp_path, max_bytes=20000)
+
+    scans = []
+    evict = ResultCache.evict
+    monkeypatch.setattr(ResultCache, "evict", lambda self: scans.append(1) or evict(self))
+
+    detections = Detections.from_xywh(numpy.zeros((1, 4)), numpy.zeros(1, dtype=numpy.int64), numpy.ones(1))
+    puts = 1000
+    for index in range(puts):
+        result_cache.put(f"{index:064x}", Circuit([], [], []), detections)
+        assert _size(tmp_path) <= result_cache.max_bytes
+
+    # the first put scans, then every put of the space a full cache is evicted by at most
+    entry_size = _size(tmp_path) / len(list(tmp_path.glob("*/*.json")))
+    room = result_cache.max_bytes * (1 - cache.EVICT_TO)
+    assert 1 < len(scans) <= 2 + puts * entry_size / room
+    assert len(scans) < puts / 10
+
+    # entries put by other processes are seen at the next scan
+    scans.clear()
+    for index in range(cache.SCAN_INTERVAL):
+        result_cache._estimated_bytes = 0
+        result_cache.put(f"{index:064x}", Circuit([], [], []), detections)
+    assert len(scans) == 1
@@ -0,0 +1,83 @@
+from sketchlogic.circuit import Circuit, IO, Pin, Wire, ObjectType
+import sketchlogic.converter.logisim.serializer as serializer
+import xml.etree.ElementTree as ElementTree
+
+
+def _io(io_id: int, io_type: ObjectType, center: tuple[int, int]) -> IO:
+    return IO(io_id, io_type, center[0], center[1], 20, 20, 0, Pin(io_id + 1))
+
+
+def _point(text: str) -> tuple[int, int]:
+    x, y = text.strip("()").split(",")
+    return int(x), int(y)
+
+
+def _on(point: tuple[int, int], segment: tuple[tuple[int, int], tuple[int, int]]) -> bool:
+    (x, y), ((x1, y1), (x2, y2)) = point, segment
+    return min(x1, x2) <= x <= max(x1, x2) and min(y1, y2) <= y <= max(y1, y2)
+
+
+def _touches(first: tuple, second: tuple) -> bool:
+    """
+    Whether Logisim joins two horizontal or vertical segments: they run along each other, or an end
+    of one is on the other. Segments that only cross do not connect.
+    """
+
+    if any(_on(end, second) for end in first) or any(_on(end, first) for end in second):
+        return True
+
+    (x1, y1), (x2, y2) = first
+    (x3, y3), (x4, y4) = second
+    if y1 == y2 == y3 == y4:
+        return max(min(x1, x2), min(x3, x4)) <= min(max(x1, x2), max(x3, x4))
+    if x1 == x2 == x3 == x4:
+        return max(min(y1, y2), min(y3, y4)) <= min(max(y1, y2), max(y3, y4))
+
+    return False
+
+
+def _net(segments: list[tuple], pin: tuple[int, int]) -> set[tuple]:
+    """
+    Gets the segments joined to a pin, directly or through other segments.
+    """
+
+    net = {segment for segment in segments if _on(pin, segment)}
+    stack = list(net)
+    while stack:
+        segment = stack.pop()
+        for other in segments:
+            if other not in net and _touches(segment, other):
+                net.add(other)
+                stack.append(other)
+
+    return net
+
+
+def test_crossing_wires_are_not_joined():
+    # A feeds D below it and B feeds C above it, so their wires have to cross
+    a = _io(1, ObjectType.TOGGLE, (100, 300))
+    b = _io(3, ObjectType.TOGGLE, (100, 700))
+    c = _io(5, ObjectType.PROBE, (500, 430))
+    d = _io(7, ObjectType.PROBE, (500, 530))
+    wires = [Wire(9, [], a.pin.id, d.pin.id), Wire(10, [], b.pin.id, c.pin.id)]
+
+    root = ElementTree.fromstring(serializer.serialize(Circuit([], [a, b, c, d], wires)))
+    segments = [(_point(wire.get("from")), _point(wire.get("to"))) for wire in root.iter("wire")]
+
+    for segment in segments:
+        (x1, y1), (x2, y2) = segment
+        assert x1 == x2 or y1 == y2
+
+    first = _net(segments, (a.center_x, a.center_y))
+    second = _net(segments, (b.center_x, b.center_y))
+
+    assert first and second
+    assert first.isdisjoint(second)
+    assert not any(_touches(segment, other) for segment in first for other in second)
+
+    # every segment is on one of the two nets, and each net reaches its probe
+    assert first | second == set(segments)
+    assert any(_on((d.center_x, d.center_y), segment) for segment in first)
+    assert any(_on((c.center_x, c.center_y), segment) for segment in second)
+    assert not any(_on((c.center_x, c.center_y), segment) for segment in first)
+    assert not any(_on((d.center_x, d.center_y), segment) for segment in second)
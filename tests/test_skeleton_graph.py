@@ -0,0 +1,19 @@
+import sketchlogic.connector.skeleton_graph as skeleton_graph
+import numpy
+
+
+def test_polylines_trace_every_leaf_of_a_net_back_to_its_hub():
+    # a hub at the origin, with many leaves each at the end of a chain of 2 edges
+    leaves = 500
+    nodes = list(range(2 * leaves + 1))
+    edges = []
+    for index in range(leaves):
+        edges.append((0, 1 + index, numpy.array([(0, 0), (index, 10)], dtype=numpy.int32)))
+        edges.append((leaves + 1 + index, 1 + index, numpy.array([(index, 20), (index, 10)], dtype=numpy.int32)))
+
+    output, nets = skeleton_graph.polylines(nodes, edges, min_length=1, corners_approximation=0.0)
+
+    assert nets == [0] * leaves
+    assert sorted(polyline.reshape(-1, 2).tolist() for polyline in output) == sorted(
+        [[index, 20], [index, 10], [0, 0]] for index in range(leaves)
+    )
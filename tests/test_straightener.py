@@ -0,0 +1,28 @@
+from sketchlogic.circuit import Gate, Pin, Wire, ObjectType
+from sketchlogic.registry import CircuitRegistry
+import sketchlogic.converter.straightener as straightener
+
+
+def _gate(gate_id: int, gate_type: ObjectType, center: tuple[int, int], inputs: int) -> Gate:
+    return Gate(
+        gate_id, gate_type, center[0], center[1], inputs * 20, inputs * 20, 0,
+        [Pin(gate_id + 1 + index) for index in range(inputs)], Pin(gate_id + 1 + inputs)
+    )
+
+
+def test_link_from_3_input_gate_is_lined_up_from_the_other_end():
+    # a 3 input gate does not move what it is wired to, so the 2 input gate it feeds lines it up
+    for order in (0, 1):
+        and_gate = _gate(1, ObjectType.AND_GATE, (800, 1000), 3)
+        or_gate = _gate(10, ObjectType.OR_GATE, (1000, 1010), 2)
+        wire = Wire(20, [(830, 1000), (960, 1010)], and_gate.output.id, or_gate.inputs[0].id)
+
+        model_results = [and_gate, or_gate] if order == 0 else [or_gate, and_gate]
+        straightened = straightener.straighten(
+            model_results, CircuitRegistry(model_results + [wire]), min_wire_length=30, debug=False
+        )
+
+        assert straightened == 1
+        assert (or_gate.center_x, or_gate.center_y) == (1000, 1010)
+        assert and_gate.center_y == or_gate.center_y
+        assert and_gate.center_x < or_gate.center_x
@@ -0,0 +1,50 @@
+from sketchlogic.circuit import Gate, Pin, ObjectType
+from sketchlogic.registry import CircuitRegistry
+import sketchlogic.connector.wiring.generator as generator
+import numpy
+
+
+def _contour(points: list[tuple[int, int]]) -> numpy.ndarray:
+    return numpy.array(points, dtype=numpy.int32).reshape(-1, 1, 2)
+
+
+def _straight(start: tuple[int, int], end: tuple[int, int]) -> list[tuple[int, int]]:
+    """
+    Every pixel of a horizontal or vertical line, from start to end.
+    """
+
+    (x1, y1), (x2, y2) = start, end
+    steps = max(abs(x2 - x1), abs(y2 - y1))
+    return [(x1 + (x2 - x1) * step // steps, y1 + (y2 - y1) * step // steps) for step in range(steps + 1)]
+
+
+def test_merge_nets_joins_branches_from_source_gate_to_sink_gate():
+    # a source left of the hub, and sinks right of and below it, whose ends sort before the gate end
+    hub = (100, 100)
+    source_gate, right_gate, lower_gate = (20, 100), (180, 100), (100, 180)
+
+    contours = [_contour(_straight(gate, hub)) for gate in (source_gate, right_gate, lower_gate)]
+    wires, _, _ = generator.generate(
+        contours, next_id=10, optional_min_side=1000, strict_min_side=1000, straightness_tolerance=5, nets=[0, 0, 0]
+    )
+
+    driver = Gate(1, ObjectType.NOT_GATE, 0, 100, 40, 40, 0, [Pin(2)], Pin(3))
+    right = Gate(4, ObjectType.NOT_GATE, 200, 100, 40, 40, 0, [Pin(5)], Pin(6))
+    lower = Gate(7, ObjectType.NOT_GATE, 100, 200, 40, 40, 0, [Pin(8)], Pin(9))
+    registry = CircuitRegistry([driver, right, lower] + wires)
+
+    source, right_sink, lower_sink = wires
+    registry.attach(source, "main_input", driver.output.id)
+    registry.attach(right_sink, "main_output", right.inputs[0].id)
+    registry.attach(lower_sink, "main_output", lower.inputs[0].id)
+
+    removed = generator.merge_nets(wires, registry)
+
+    assert removed == [source]
+    assert wires == [right_sink, lower_sink]
+
+    for sink, gate_end in ((right_sink, right_gate), (lower_sink, lower_gate)):
+        assert sink.main_input == driver.output.id
+        assert sink.points[0] == source_gate
+        assert sink.points[-1] == gate_end
+        assert hub in sink.points